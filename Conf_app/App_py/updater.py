@@ -1,4 +1,4 @@
-import requests, os, ssl, subprocess, time
+import requests, os, ssl, subprocess, time, hashlib
 
 # --- Ignora SSL corporativo (seguro em rede interna) ---
 ssl._create_default_https_context = ssl._create_unverified_context
@@ -6,14 +6,40 @@ requests.packages.urllib3.disable_warnings()
 
 # --- Configurações principais ---
 REPO = "Kvsl11/Auto_form"
-URL_VERSION = f"https://raw.githubusercontent.com/{REPO}/main/version.txt"
-URL_SCRIPT = f"https://raw.githubusercontent.com/{REPO}/main/main.py"
+URL_BASE = f"https://raw.githubusercontent.com/{REPO}/main/"
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
 LOCAL_SCRIPT = "main.py"
 LOCAL_VERSION_FILE = "version_local.txt"
+# Protocolo de atualização (cache, manifest com ETag, SHA-256): única cópia em updater_core.py
+CORE_FILE = "updater_core.py"
 
 # Caminho do Python interno (sem console)
 PYTHONW_PATH = os.path.join(os.getcwd(), "Python313", "python.exe")
 
+# --- Atualizador compartilhado ---
+def carregar_atualizador():
+    """Importa o updater_core.py; na primeira execução, baixa-o conferindo o SHA-256 do manifest.
+
+    Este arquivo roda sozinho a partir do Conf_app.zip, antes de existir qualquer
+    arquivo do repositório na pasta; por isso guarda só este passo inicial.
+    """
+    try:
+        import updater_core
+    except ImportError:
+        print(f"⬇️ Baixando {CORE_FILE}...")
+        manifest = requests.get(URL_BASE + "manifest.json", timeout=10, verify=False).json()
+        esperado = manifest["files"][CORE_FILE]["sha256"]
+        r = requests.get(URL_BASE + CORE_FILE, timeout=20, verify=False)
+        r.raise_for_status()
+        if hashlib.sha256(r.content).hexdigest() != esperado:
+            raise ValueError(f"SHA-256 de {CORE_FILE} não confere com o manifest.")
+        tmp_path = os.path.join(APP_DIR, CORE_FILE + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(r.content)
+        os.replace(tmp_path, os.path.join(APP_DIR, CORE_FILE))
+        import updater_core
+    return updater_core.ManifestUpdater(APP_DIR, URL_BASE, log=print)
+
 # --- Funções auxiliares ---
 def get_local_version():
     if os.path.exists(LOCAL_VERSION_FILE):
@@ -21,34 +47,11 @@ def get_local_version():
             return f.read().strip()
     return "0.0.0"
 
-def get_online_version():
+def atualizar_script(updater):
+    """Atualiza pelo manifest.json: só baixa os arquivos que mudaram, sem sobrescrever o atual antes da conferência."""
     try:
-        headers = {"Cache-Control": "no-cache", "Pragma": "no-cache"}
-        r = requests.get(URL_VERSION, timeout=10, verify=False, headers=headers)
-        if r.status_code == 200:
-            return r.text.strip()
-        print(f"⚠️ Erro HTTP ao buscar versão: {r.status_code}")
-    except Exception as e:
-        print("⚠️ Erro ao obter versão online:", e)
-    return None
-
-def atualizar_script():
-    """Baixa a nova versão do main.py diretamente e substitui a existente."""
-    try:
-        print("⬇️ Baixando nova versão do main.py...")
-        headers = {"Cache-Control": "no-cache", "Pragma": "no-cache"}
-        r = requests.get(URL_SCRIPT, timeout=20, verify=False, headers=headers)
-        r.raise_for_status()
-        conteudo = r.content
-
-        # Remove o main.py antigo (se existir)
-        if os.path.exists(LOCAL_SCRIPT):
-            os.remove(LOCAL_SCRIPT)
-
-        with open(LOCAL_SCRIPT, "wb") as f:
-            f.write(conteudo)
-
-        print("✅ main.py atualizado com sucesso.")
+        updater.apply_update()
+        print("✅ Arquivos atualizados com sucesso.")
         return True
     except Exception as e:
         print("❌ Erro ao atualizar script:", e)
@@ -79,19 +82,27 @@ def iniciar_app():
 def main():
     print("🔍 Verificando atualizações...")
     local_v = get_local_version()
-    online_v = get_online_version()
+    try:
+        updater = carregar_atualizador()
+    except Exception as e:
+        print(f"⚠️ Não foi possível obter o {CORE_FILE} ({e}). Rodando local.")
+        iniciar_app()
+        return
+    online_v, erro = updater.check_online_version()
 
     print(f"Versão local: {local_v}")
-    print(f"Versão online: {online_v}")
+    print(f"Versão online: {online_v or None}")
 
     if not online_v:
-        print("⚠️ Falha ao obter versão online. Rodando versão local.")
+        print(f"⚠️ Sem conexão ou erro de versão online ({erro}). Rodando local.")
         iniciar_app()
         return
 
-    if online_v != local_v:
-        print(f"🟡 Nova versão detectada: {online_v}. Atualizando automaticamente...")
-        ok = atualizar_script()
+    # Mesmo com a versão em dia, arquivos faltando ou diferentes do manifest (ex.: form_engine.py
+    # ausente depois de um atualizador antigo que só trazia o main.py) são baixados de novo
+    if online_v != local_v or updater.needs_update():
+        print(f"🟡 Atualização necessária: {online_v} (local: {local_v})")
+        ok = atualizar_script(updater)
         if ok:
             save_local_version(online_v)
             print("♻️ Reiniciando com nova versão...")
@@ -56,11 +56,13 @@ set "TMP_FILE=%REQ_FILE%.tmp"
 type nul > "%TMP_FILE%"
 
 set "CORE_MODULES=asyncio base64 calendar collections concurrent contextlib copy csv ctypes datetime difflib email enum fnmatch functools glob hashlib heapq http io itertools json linecache locale logging math mimetypes numbers operator os pathlib pickle pkgutil platform queue random re shutil signal socket sqlite3 ssl statistics string struct subprocess sys tempfile textwrap threading time tkinter types typing unicodedata urllib uuid warnings weakref xml zipfile webbrowser argparse inspect dataclasses"
+REM Módulos do próprio app (ficam ao lado do main.py, não vêm do pip)
+set "LOCAL_MODULES=form_engine"
 
 for /f "usebackq delims=" %%M in ("%REQ_FILE%") do (
     set "mod=%%M"
     if not "!mod!"=="" (
-        echo !CORE_MODULES! | findstr /i "\<!mod!\>" >nul
+        echo !CORE_MODULES! !LOCAL_MODULES! | findstr /i "\<!mod!\>" >nul
         if errorlevel 1 (
             findstr /ix "!mod!" "%TMP_FILE%" >nul || echo !mod!>>"%TMP_FILE%"
         )
@@ -71,8 +73,8 @@ move /y "%TMP_FILE%" "%REQ_FILE%" >nul
 echo setuptools>>"%REQ_FILE%"
 echo wheel>>"%REQ_FILE%"
 
-REM === Dependências obrigatórias extras (sempre adicionadas) ===
-for %%P in (openpyxl) do (
+REM === Dependências obrigatórias extras (sempre adicionadas; o main.py importa estas sob demanda, dentro de funções) ===
+for %%P in (openpyxl pandas selenium undetected-chromedriver) do (
     findstr /ix "%%P" "%REQ_FILE%" >nul || echo %%P>>"%REQ_FILE%"
 )
 
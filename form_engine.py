@@ -0,0 +1,2987 @@
+"""Motor da automação (sem Qt): lê a planilha e envia cada linha ao Google Forms.
+
+Usado pela janela (main.py, via FormsWorker) e direto pela linha de comando,
+para execuções agendadas em servidores sem tela:
+
+    python form_engine.py --url URL --planilha dados.xlsx [--mapeamento mapa.json]
+                          [--headless] [--concorrencia N] [--http] [--json]
+
+Códigos de saída: 0 tudo enviado, 1 alguma linha falhou, 2 a execução não pôde
+rodar (URL, planilha, colunas, formulário ou Chrome), 130 interrompida (Ctrl+C).
+"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+import json
+import hashlib
+import unicodedata
+import time
+import math
+import heapq
+import random
+import itertools
+import numbers
+import datetime
+import difflib
+import fnmatch
+import shutil
+import ssl
+import certifi
+import argparse
+import threading
+import queue
+import requests
+import subprocess
+import urllib3
+from pathlib import Path
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import urlencode
+
+# Versão do motor; o main.py só abre com o motor da mesma versão (VERSAO)
+ENGINE_VERSION = "1.0.3"
+
+# pandas, openpyxl, selenium e undetected_chromedriver são carregados sob demanda
+# (ver "IMPORTAÇÕES SOB DEMANDA" abaixo); este módulo nunca importa o Qt.
+
+
+# ==========================
+# IMPORTAÇÕES SOB DEMANDA
+# ==========================
+
+# Preenchidos por load_sheet_modules()/load_browser_modules() no primeiro uso
+pd = None
+openpyxl = None
+uc = None
+By = WebDriverWait = EC = Options = None
+TimeoutException = NoSuchElementException = ElementClickInterceptedException = WebDriverException = None
+
+_lazy_import_lock = threading.Lock()
+# Tempo gasto em cada grupo de importação tardia, exibido pelo --profile-startup
+LAZY_IMPORT_TIMES = {}
+
+
+def load_sheet_modules():
+    """Importa pandas e openpyxl (só na primeira chamada)."""
+    global pd, openpyxl
+    with _lazy_import_lock:
+        if pd is not None:
+            return
+        started = time.perf_counter()
+        import pandas
+        import openpyxl as _openpyxl
+        openpyxl = _openpyxl
+        pd = pandas
+        LAZY_IMPORT_TIMES["pandas + openpyxl"] = time.perf_counter() - started
+
+
+def load_browser_modules():
+    """Importa selenium e undetected_chromedriver (só na primeira chamada)."""
+    global uc, By, WebDriverWait, EC, Options
+    global TimeoutException, NoSuchElementException, ElementClickInterceptedException, WebDriverException
+    with _lazy_import_lock:
+        if uc is not None:
+            return
+        started = time.perf_counter()
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import (
+            TimeoutException,
+            NoSuchElementException,
+            ElementClickInterceptedException,
+            WebDriverException,
+        )
+        from selenium.webdriver.chrome.options import Options
+        import undetected_chromedriver
+        uc = undetected_chromedriver
+        LAZY_IMPORT_TIMES["selenium + undetected_chromedriver"] = time.perf_counter() - started
+
+
+def preload_heavy_modules():
+    """Carrega os módulos pesados em segundo plano, depois que a janela já está visível."""
+    for loader in (load_sheet_modules, load_browser_modules):
+        try:
+            loader()
+        except Exception:
+            # Erros de importação reaparecem (com mensagem) quando a automação for iniciada
+            pass
+
+
+# ==========================
+# CONFIGURAÇÕES INICIAIS
+# ==========================
+
+# Corrige SSL e suprime avisos
+def apply_ssl_fix():
+    """Garante que o ambiente Python reconheça certificados SSL e suprime avisos de requisição insegura."""
+    try:
+        os.environ["SSL_CERT_FILE"] = certifi.where()
+        ssl._create_default_https_context = ssl._create_unverified_context
+        # Suprime o aviso de InsecureRequestWarning
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    except Exception:
+        pass
+
+
+# Mapeamento de campos (seletor CSS -> coluna). As colunas são associadas às perguntas
+# pelo título, via esquema do formulário; os seletores só são usados se os metadados
+# do formulário não puderem ser lidos.
+FIELD_MAPPING_DEFAULT = {
+    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(1) > div > div > div.vQES8d > div > div:nth-child(1) > div.ry3kXd > div.MocG8c.HZ3kWc.mhLiyf.LMgvRb.DEh1R.KKjvXb': "TECNOLOGIA",
+    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(2) > div > div > div.vQES8d > div > div:nth-child(1) > div.ry3kXd > div.MocG8c.HZ3kWc.mhLiyf.LMgvRb.KKjvXb.DEh1R': "UNIDADE",
+    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(3) > div > div > div.vQES8d > div > div:nth-child(1) > div.ry3kXd > div.MocG8c.HZ3kWc.mhLiyf.LMgvRb.KKjvXb.DEh1R': "SETOR",
+    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(4) > div > div > div.vQES8d > div > div:nth-child(1) > div.ry3kXd > div.MocG8c.HZ3kWc.mhLiyf.LMgvRb.KKjvXb.DEh1R': "FRENTE",
+    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(5) > div > div > div.vQES8d > div > div:nth-child(1) > div.ry3kXd > div.MocG8c.HZ3kWc.mhLiyf.LMgvRb.KKjvXb.DEh1R': "MODELO",
+    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(6) > div > div > div.AgroKb > div > div.aCsJod.oJeWuf > div > div.Xb9hP > input': "FROTA",
+    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(7) > div > div > div.AgroKb > div > div.RpC4Ne.oJeWuf > div.Pc9Gce.Wic03c > textarea': "QRM",
+    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(8) > div > div > div.AgroKb > div > div.RpC4Ne.oJeWuf > div.Pc9Gce.Wic03c > textarea': "LOCAL (QTH)",
+    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(9) > div > div > div.AgroKb > div > div.RpC4Ne.oJeWuf > div.Pc9Gce.Wic03c > textarea': "RESPONSÁVEL PELA O.S",
+}
+
+
+# ==========================
+# ESQUEMA DO FORMULÁRIO (METADADOS + CACHE)
+# ==========================
+
+APP_DIR = Path(os.path.abspath(__file__)).parent
+SCHEMA_CACHE_DIR = APP_DIR / "cache" / "forms"
+# Muda quando o formato dos campos salvos muda (esquemas em cache de outra versão são relidos)
+SCHEMA_VERSION = 2
+
+# Códigos de tipo de pergunta usados pelo Google Forms no FB_PUBLIC_LOAD_DATA_
+FORM_FIELD_TYPES = {
+    0: "texto",
+    1: "paragrafo",
+    2: "multipla",
+    3: "lista",
+    4: "caixas",
+    5: "escala",
+    7: "grade",
+    9: "data",
+    10: "hora",
+}
+
+
+def form_id_from_url(form_url: str) -> str:
+    """ID do formulário na URL (.../forms/d/e/<id>/viewform), usado como chave do cache."""
+    match = re.search(r"/forms/d/(?:e/)?([^/?#]+)", form_url)
+    if not match:
+        raise ValueError(f"URL de formulário não reconhecida: {form_url}")
+    return match.group(1)
+
+
+def normalize_title(text: str) -> str:
+    """Normaliza títulos/colunas para comparação: sem acentos, sem pontuação, minúsculo."""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9a-zA-Z]+", " ", text).lower().split())
+
+
+def _load_data_items(html: str) -> list:
+    match = re.search(r"FB_PUBLIC_LOAD_DATA_\s*=\s*(.*?);\s*</script>", html, re.S)
+    if not match:
+        raise ValueError("metadados do formulário (FB_PUBLIC_LOAD_DATA_) não encontrados")
+    data = json.loads(match.group(1))
+    return data[1][1] or []
+
+
+def extract_form_schema(html: str) -> dict:
+    """Lê os metadados embutidos na página do formulário (título, entry, tipo, opções de cada pergunta)."""
+    items = _load_data_items(html)
+    fields = []
+    for item in items:
+        # Itens sem campo de resposta (títulos, seções, imagens) não possuem item[4]
+        if len(item) < 5 or not item[4]:
+            continue
+        entry = item[4][0]
+        options = [opt[0] for opt in (entry[1] or []) if opt and opt[0]]
+        fields.append({
+            "entry": f"entry.{entry[0]}",
+            "title": (item[1] or "").strip(),
+            "type": FORM_FIELD_TYPES.get(item[3], str(item[3])),
+            "options": options,
+            # Opção "Outro" (texto livre): aparece como uma opção vazia marcada com 1 na posição 4
+            "other": any(opt and len(opt) > 4 and opt[4] == 1 for opt in (entry[1] or [])),
+            "required": bool(entry[2]) if len(entry) > 2 else False,
+            "position": len(fields) + 1,
+        })
+    digest = hashlib.sha256(json.dumps(items, sort_keys=True).encode("utf-8")).hexdigest()
+    return {"hash": digest, "version": SCHEMA_VERSION, "fields": fields}
+
+
+def load_cached_schema(form_id: str):
+    path = SCHEMA_CACHE_DIR / f"{form_id}.json"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_schema(schema: dict):
+    SCHEMA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = SCHEMA_CACHE_DIR / f"{schema['form_id']}.json"
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def get_form_schema(form_url: str, session=None):
+    """Retorna (esquema, origem) do formulário, usando o cache em disco sempre que possível.
+
+    A página é baixada uma vez por execução só para conferir se o formulário mudou
+    (hash dos metadados); sem rede, o esquema em cache é usado como está.
+    """
+    form_id = form_id_from_url(form_url)
+    cached = load_cached_schema(form_id)
+    own_session = session is None
+    session = session or build_http_session()
+    try:
+        page = session.get(form_url, timeout=HTTP_TIMEOUT)
+        page.raise_for_status()
+        html = page.text
+    except requests.exceptions.RequestException:
+        if cached:
+            return cached, "cache (offline)"
+        raise
+    finally:
+        if own_session:
+            session.close()
+
+    schema = extract_form_schema(html)
+    if cached and cached.get("hash") == schema["hash"] and cached.get("version") == SCHEMA_VERSION:
+        return cached, "cache"
+
+    schema["form_id"] = form_id
+    schema["fetched_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        save_cached_schema(schema)
+    except OSError:
+        pass
+    return schema, ("atualizado" if cached else "novo")
+
+
+def selector_question_index(selector: str):
+    """Posição (1..N) da pergunta referenciada por um seletor de FIELD_MAPPING_DEFAULT, ou None."""
+    match = re.search(r"div\.o3Dpx > div:nth-child\((\d+)\)", selector)
+    return int(match.group(1)) if match else None
+
+
+def match_columns_to_schema(field_mapping: dict, schema: dict):
+    """Associa cada coluna mapeada a uma pergunta do esquema.
+
+    A associação é feita pelo título da pergunta; seletores antigos de
+    FIELD_MAPPING_DEFAULT caem para a posição da pergunta e chaves 'entry.<id>'
+    são usadas diretamente. Retorna (coluna -> campo, colunas sem pergunta).
+    """
+    by_title = {normalize_title(f["title"]): f for f in schema["fields"]}
+    by_entry = {f["entry"]: f for f in schema["fields"]}
+    by_position = {f["position"]: f for f in schema["fields"]}
+
+    matched = {}
+    unmatched = []
+    for key, column_name in field_mapping.items():
+        field = by_entry.get(key) or by_title.get(normalize_title(column_name))
+        if field is None:
+            field = by_position.get(selector_question_index(key))
+        if field is None:
+            unmatched.append(column_name)
+        else:
+            matched[column_name] = field
+    return matched, unmatched
+
+
+def schema_field_selector(field: dict) -> str:
+    """Seletor CSS do elemento preenchível de uma pergunta, ancorado no input oculto do entry."""
+    container = f'div[role="listitem"]:has(input[name="{field["entry"]}"])'
+    if field["type"] == "paragrafo":
+        return f"{container} textarea"
+    if field["type"] == "lista":
+        return f'{container} div[role="listbox"]'
+    if field["type"] in ("multipla", "caixas", "escala"):
+        return f'{container} div[role="radiogroup"], {container} div[role="list"]'
+    return f'{container} input:not([type="hidden"])'
+
+
+def prefilled_form_url(form_url: str, values: dict) -> str:
+    """URL do formulário já preenchido (entry.<id>=valor), no formato do link 'pré-preenchido' do Forms."""
+    base = form_url.split("?", 1)[0].split("#", 1)[0]
+    query = urlencode([("usp", "pp_url")] + [(entry, value) for entry, value in values.items() if value])
+    return f"{base}?{query}"
+
+
+# ==========================
+# LEITURA DA PLANILHA (STREAMING)
+# ==========================
+
+# Linhas convertidas por vez em DataFrame; mantém a memória constante em planilhas grandes
+SHEET_CHUNK_ROWS = 200
+
+
+class SheetStream:
+    """Lê a primeira aba da planilha linha a linha (openpyxl read_only), só com as colunas mapeadas.
+
+    O cabeçalho é lido e validado na abertura (quebras de linha removidas,
+    colunas ausentes em `missing`); as linhas só são lidas ao iterar.
+    """
+
+    def __init__(self, excel_path: str, columns):
+        load_sheet_modules()
+        self.workbook = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+        try:
+            sheet = self.workbook.worksheets[0]
+            self._rows = sheet.iter_rows(values_only=True)
+            header = next(self._rows, None) or ()
+            self.header = [str(c).replace("\n", " ").strip() if c is not None else "" for c in header]
+            self.columns = list(dict.fromkeys(columns))
+            self.column_index = {column: i for i, column in enumerate(self.columns)}
+            self.missing = [c for c in self.columns if c not in self.header]
+            self._positions = [self.header.index(c) for c in self.columns if c in self.header]
+            # Estimativa pela dimensão gravada no arquivo (0 se o arquivo não informar)
+            self.total = max(0, (sheet.max_row or 1) - 1)
+        except Exception:
+            self.workbook.close()
+            raise
+
+    def _blocks(self, chunk_size: int):
+        """Gera (índices, linhas) com até chunk_size linhas de células cruas do openpyxl."""
+        records = []
+        index = []
+        for number, values in enumerate(self._rows):
+            picked = tuple(values[i] if i < len(values) else None for i in self._positions)
+            # Linhas totalmente vazias (comuns no fim das exportações) são ignoradas
+            if all(v is None or (isinstance(v, str) and not v.strip()) for v in picked):
+                continue
+            records.append(picked)
+            index.append(number)
+            if len(records) >= chunk_size:
+                yield index, records
+                records, index = [], []
+        if records:
+            yield index, records
+
+    def iter_chunks(self, chunk_size: int = SHEET_CHUNK_ROWS):
+        """Gera DataFrames de até chunk_size linhas, indexados pela posição da linha de dados (0..N-1)."""
+        for index, records in self._blocks(chunk_size):
+            yield pd.DataFrame(records, columns=self.columns, index=index)
+
+    def iter_rows(self, normalize, chunk_size: int = SHEET_CHUNK_ROWS):
+        """Gera (índice, valores, originais) na ordem da planilha, normalizando um bloco por vez.
+
+        `valores` é a tupla de textos prontos para envio (ordem de `columns`,
+        posições em `column_index`); `originais` traz as células cruas do
+        openpyxl, de antes do DataFrame (o dtype de uma coluna depende das
+        outras linhas do bloco e não pode mudar a identidade da linha).
+        """
+        for index, records in self._blocks(chunk_size):
+            values = normalize(pd.DataFrame(records, columns=self.columns, index=index))
+            yield from zip(index, values.itertuples(index=False, name=None), records)
+
+    def close(self):
+        self.workbook.close()
+
+
+# ==========================
+# NORMALIZAÇÃO DOS VALORES
+# ==========================
+
+# Formatos padrão do texto enviado (cada execução pode trocar via ValueFormats)
+DATE_FORMAT = "%d/%m/%Y"
+DATETIME_FORMAT = "%d/%m/%Y %H:%M"
+TIME_FORMAT = "%H:%M"
+DECIMAL_SEPARATOR = "."
+# Perguntas de data/hora do Forms só aceitam estes formatos (URL pré-preenchida e envio direto)
+FORM_DATE_FORMATS = {"data": "%Y-%m-%d", "hora": "%H:%M"}
+# Acima disso um float não guarda o inteiro exato; o número segue como veio
+FLOAT_EXACT_INT = 2 ** 53
+
+
+def _value_kind(value) -> str:
+    """Classe do valor de uma célula numa coluna mista: numero, data, hora ou texto."""
+    if isinstance(value, bool):
+        return "texto"
+    if isinstance(value, numbers.Number):
+        return "numero"
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return "data"
+    if isinstance(value, datetime.time):
+        return "hora"
+    return "texto"
+
+
+class ValueFormats:
+    """Converte as células da planilha no texto enviado ao formulário, uma coluna inteira por vez.
+
+    Inteiros saem sem ".0" (FROTA 1234, não "1234.0"), datas sem o horário zerado
+    e no formato configurado (ou no exigido pelas perguntas de data/hora),
+    números com o separador decimal escolhido. Texto é mantido como veio, só sem
+    os espaços das pontas; vazios viram "". Em perguntas de escolha, o valor que
+    casa com uma opção (texto exato ou normalizado) vira o rótulo da opção.
+    """
+
+    def __init__(self, date_format: str = DATE_FORMAT, datetime_format: str = DATETIME_FORMAT, time_format: str = TIME_FORMAT, decimal_separator: str = DECIMAL_SEPARATOR, number_format: str | None = None):
+        self.date_format = date_format
+        self.datetime_format = datetime_format
+        self.time_format = time_format
+        self.decimal_separator = decimal_separator
+        self.number_format = number_format  # especificação de format() para não inteiros (ex.: ".2f")
+
+    def normalize(self, chunk, form_fields: dict | None = None):
+        """DataFrame de textos com o mesmo índice e colunas do bloco lido."""
+        form_fields = form_fields or {}
+        columns = {}
+        for column in chunk.columns:
+            field = form_fields.get(column, {})
+            text = self.column(chunk[column], field.get("type"))
+            if field.get("type") in CHOICE_FIELD_TYPES and field.get("options"):
+                text = canonical_choices(text, field["options"])
+            columns[column] = text
+        return pd.DataFrame(columns, index=chunk.index)
+
+    def column(self, values, field_type: str | None = None):
+        """Texto de uma coluna; field_type é o tipo da pergunta (data/hora mudam o formato)."""
+        text = pd.Series("", index=values.index, dtype=object)
+        present = values[values.notna()]
+        if present.empty:
+            return text
+        if pd.api.types.is_datetime64_any_dtype(present):
+            text[present.index] = self._dates(present, field_type)
+        elif pd.api.types.is_numeric_dtype(present) and not pd.api.types.is_bool_dtype(present):
+            text[present.index] = self._numbers(present)
+        else:
+            # Coluna mista: cada classe de valor é convertida de uma vez
+            for kind, group in present.groupby(present.map(_value_kind)):
+                if kind == "numero":
+                    text[group.index] = self._numbers(pd.to_numeric(group))
+                elif kind == "data":
+                    text[group.index] = self._dates(group, field_type)
+                elif kind == "hora":
+                    text[group.index] = group.map(lambda t: t.strftime(self.time_format))
+                else:
+                    text[group.index] = group.astype(str)
+        return text.str.strip()
+
+    def _numbers(self, values):
+        if pd.api.types.is_integer_dtype(values):
+            return values.astype(str)
+        values = values.astype(float)
+        integral = (values % 1 == 0) & (values.abs() < FLOAT_EXACT_INT)
+        if self.number_format:
+            text = values.map(lambda v: format(v, self.number_format))
+        else:
+            text = values.astype(str)
+        if self.decimal_separator != ".":
+            text = text.str.replace(".", self.decimal_separator, regex=False)
+        text[integral] = values[integral].astype("int64").astype(str)
+        return text
+
+    def _dates(self, values, field_type: str | None):
+        try:
+            dates = pd.to_datetime(values)
+        except (ValueError, TypeError, OverflowError):
+            return values.astype(str)  # fora do intervalo do pandas: segue como veio
+        if field_type in FORM_DATE_FORMATS:
+            return dates.dt.strftime(FORM_DATE_FORMATS[field_type])
+        text = dates.dt.strftime(self.datetime_format)
+        midnight = dates == dates.dt.normalize()
+        text[midnight] = dates[midnight].dt.strftime(self.date_format)
+        return text
+
+
+# ==========================
+# PRÉ-VALIDAÇÃO DA PLANILHA
+# ==========================
+
+# Tipos de pergunta cuja resposta precisa ser exatamente uma das opções do formulário
+CHOICE_FIELD_TYPES = {"multipla", "lista", "escala"}
+
+
+def canonical_choices(values, options):
+    """Troca cada valor que casa com uma opção (option_position) pelo rótulo da opção; os demais ficam como vieram."""
+    labels = [o.strip() for o in options]
+    index = build_option_index(labels)
+    canonical = {}
+    for value in values.unique():
+        position = option_position(index, value) if value else None
+        canonical[value] = value if position is None else labels[position]
+    return values.map(canonical)
+
+
+def preflight_problems(chunk, form_fields: dict) -> dict:
+    """Confere um bloco já normalizado (ValueFormats) contra o esquema do formulário, uma coluna por vez.
+
+    Retorna índice da linha -> lista de problemas (obrigatória vazia, valor fora
+    das opções de lista/múltipla escolha/escala).
+    """
+    problems = {}
+    for column, field in form_fields.items():
+        values = chunk[column]
+        empty = values == ""
+        if field.get("required"):
+            for index in values.index[empty]:
+                problems.setdefault(index, []).append(f"'{column}' é obrigatória e está vazia")
+        options = [o.strip() for o in field.get("options") or []]
+        if field["type"] not in CHOICE_FIELD_TYPES or not options or field.get("other"):
+            continue
+        index = build_option_index(options)
+        valid = {value: option_position(index, value) is not None for value in values.unique()}
+        invalid = values[~empty & ~values.map(valid)]
+        if invalid.empty:
+            continue
+        # A sugestão é calculada uma vez por valor distinto, não por linha
+        hints = {}
+        for value in invalid.unique():
+            close = difflib.get_close_matches(value, options, n=1, cutoff=0.6)
+            hints[value] = f" (quis dizer '{close[0]}'?)" if close else ""
+        for index, value in invalid.items():
+            problems.setdefault(index, []).append(f"'{column}': '{value}' não é uma opção do formulário{hints[value]}")
+    return problems
+
+
+# ==========================
+# DIÁRIO DE ENVIOS (RETOMADA)
+# ==========================
+
+JOURNAL_DIR = APP_DIR / "cache" / "journal"
+# fsync em lote: a cada N registros ou T segundos (flush para o SO é imediato)
+JOURNAL_FSYNC_EVERY = 20
+JOURNAL_FSYNC_SECONDS = 2.0
+
+
+def journal_cell_text(value) -> str:
+    """Texto canônico de uma célula para a chave do diário.
+
+    Float inteiro vira o mesmo texto do int (1000.0 -> "1000"), vazio vira ""
+    e texto perde os espaços das pontas; assim a chave não depende do tipo com
+    que a célula foi lida.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        if value.is_integer() and abs(value) < FLOAT_EXACT_INT:
+            return str(int(value))
+    return str(value).strip()
+
+
+class SubmissionJournal:
+    """Diário append-only (JSONL) dos envios de um formulário, usado para retomar execuções interrompidas.
+
+    Cada registro guarda o hash de identidade da linha da planilha e o resultado.
+    A identidade vem dos valores das colunas mapeadas mais a ocorrência
+    (1ª, 2ª...) desses mesmos valores na planilha, então linhas repetidas
+    continuam sendo enviadas quantas vezes aparecem.
+    """
+
+    def __init__(self, form_id: str):
+        self.path = JOURNAL_DIR / f"{form_id}.jsonl"
+        self.sent = set()
+        self._occurrences = {}
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._load()
+        JOURNAL_DIR.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # linha incompleta (queda durante a gravação)
+                    if record.get("ok"):
+                        self.sent.add(record["key"])
+        except OSError:
+            pass
+
+    def key_for(self, values) -> str:
+        """Hash de identidade da linha (chamar na ordem da planilha)."""
+        normalized = [journal_cell_text(v) for v in values]
+        digest = hashlib.sha256("\x1f".join(normalized).encode("utf-8")).hexdigest()[:32]
+        with self._lock:
+            occurrence = self._occurrences.get(digest, 0) + 1
+            self._occurrences[digest] = occurrence
+        return f"{digest}#{occurrence}"
+
+    def is_sent(self, key: str) -> bool:
+        return key in self.sent
+
+    def record(self, key: str, ok: bool, row_number: int):
+        line = json.dumps({"key": key, "ok": ok, "row": row_number, "ts": time.strftime("%Y-%m-%d %H:%M:%S")})
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            if ok:
+                self.sent.add(key)
+            self._pending += 1
+            if self._pending >= JOURNAL_FSYNC_EVERY or time.monotonic() - self._last_sync >= JOURNAL_FSYNC_SECONDS:
+                self._sync()
+
+    def _sync(self):
+        try:
+            os.fsync(self._file.fileno())
+        except OSError:
+            pass
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync()
+            self._file.close()
+
+
+# ==========================
+# NOVAS TENTATIVAS (FALHAS TRANSITÓRIAS)
+# ==========================
+
+# Tentativas de cada linha durante a execução (a 1ª incluída); depois disso, só a passada final
+RETRY_MAX_ATTEMPTS = 3
+# Espera antes da 2ª tentativa; dobra a cada falha, até o teto (com jitter)
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 30.0
+# Status HTTP de instabilidade do servidor: o Forms não registrou a resposta, vale tentar de novo
+TRANSIENT_HTTP_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class RowFailure:
+    """Motivo da falha de uma linha e se outra tentativa pode dar certo (transitória)."""
+
+    def __init__(self, reason: str, transient: bool):
+        self.reason = reason
+        self.transient = transient
+
+
+class RetryQueue:
+    """Linhas que falharam, guardadas fora da fila principal da planilha.
+
+    As novas tentativas só são entregues depois de vencida a espera (backoff
+    exponencial com jitter), então quem consome a planilha nunca fica parado
+    esperando por elas. As linhas da passada final só saem quando não há mais
+    nenhuma tentativa agendada.
+    """
+
+    def __init__(self, base_delay: float = RETRY_BASE_DELAY, max_delay: float = RETRY_MAX_DELAY):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._scheduled = []  # heap de (vence_em, ordem, item)
+        self._final = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._scheduled) + len(self._final)
+
+    def backoff(self, attempt: int) -> float:
+        """Espera antes da tentativa seguinte à `attempt`; o jitter evita que as sessões voltem juntas."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    def schedule(self, item, attempt: int) -> float:
+        delay = self.backoff(attempt)
+        with self._lock:
+            heapq.heappush(self._scheduled, (time.monotonic() + delay, next(self._order), item))
+        return delay
+
+    def defer(self, item):
+        """Deixa a linha para a passada final."""
+        with self._lock:
+            self._final.append(item)
+
+    def pop(self, final_pass: bool = False):
+        """Próxima tentativa já vencida; com final_pass, também a passada final (se nada estiver agendado)."""
+        with self._lock:
+            if self._scheduled and self._scheduled[0][0] <= time.monotonic():
+                return heapq.heappop(self._scheduled)[2]
+            if final_pass and not self._scheduled and self._final:
+                return self._final.pop(0)
+        return None
+
+    def wait_time(self) -> float | None:
+        """Segundos até a próxima tentativa agendada (None se não houver)."""
+        with self._lock:
+            if not self._scheduled:
+                return None
+            return max(0.0, self._scheduled[0][0] - time.monotonic())
+
+    def drain(self) -> list:
+        with self._lock:
+            items = [item for _, _, item in sorted(self._scheduled)] + self._final
+            self._scheduled, self._final = [], []
+        return items
+
+
+# ==========================
+# DISJUNTOR (PICO DE FALHAS)
+# ==========================
+
+# Dispara com N falhas seguidas ou com a taxa de falhas das últimas tentativas acima do limite
+BREAKER_CONSECUTIVE_FAILURES = 5
+BREAKER_WINDOW = 20
+BREAKER_FAILURE_RATE = 0.6
+# Sem acesso ao formulário, a execução fica pausada e ele é sondado de novo neste intervalo
+BREAKER_PROBE_INTERVAL = 30.0
+PROBE_TIMEOUT = 10
+# URL/texto que o Forms mostra quando o formulário não aceita mais respostas
+FORM_CLOSED_MARKERS = ("closedform", "não está mais aceitando respostas", "no longer accepting responses")
+
+
+class CircuitBreaker:
+    """Acompanha o resultado das tentativas e dispara quando as falhas disparam.
+
+    consecutive=0 desliga o limite de falhas seguidas; failure_rate=0 desliga a taxa
+    (calculada só com a janela cheia, para poucas linhas não dispararem sozinhas).
+    """
+
+    def __init__(self, consecutive: int = BREAKER_CONSECUTIVE_FAILURES, window: int = BREAKER_WINDOW, failure_rate: float = BREAKER_FAILURE_RATE):
+        self.consecutive = consecutive
+        self.failure_rate = failure_rate
+        self._recent = deque(maxlen=max(1, window))
+        self._streak = 0
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool) -> str | None:
+        """Registra uma tentativa; devolve o motivo do disparo ou None."""
+        with self._lock:
+            self._recent.append(ok)
+            self._streak = 0 if ok else self._streak + 1
+            if self.consecutive and self._streak >= self.consecutive:
+                return f"{self._streak} falhas seguidas"
+            if self.failure_rate and len(self._recent) == self._recent.maxlen:
+                rate = self._recent.count(False) / len(self._recent)
+                if rate >= self.failure_rate:
+                    return f"{rate:.0%} de falhas nas últimas {len(self._recent)} tentativas"
+        return None
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._streak = 0
+
+
+def probe_form(form_url: str, session: requests.Session | None = None) -> tuple:
+    """Sonda barata do formulário (um GET, sem navegador).
+
+    Usa a sessão informada ou uma de build_http_session (mesmo SSL e User-Agent
+    do restante do app). Retorna (estado, detalhe): "ok", "rede" (sem
+    acesso/instável), "fechado" (não aceita mais respostas) ou "indisponivel"
+    (link/permissão).
+    """
+    own_session = session is None
+    if own_session:
+        session = build_http_session(pool_size=1)
+    try:
+        response = session.get(form_url, timeout=PROBE_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        return "rede", f"sem acesso ao formulário ({e.__class__.__name__})"
+    finally:
+        if own_session:
+            session.close()
+    if response.status_code in TRANSIENT_HTTP_STATUS:
+        return "rede", f"formulário instável (HTTP {response.status_code})"
+    if any(marker in response.url or marker in response.text for marker in FORM_CLOSED_MARKERS):
+        return "fechado", "o formulário não está mais aceitando respostas"
+    if response.status_code != 200:
+        return "indisponivel", f"formulário indisponível (HTTP {response.status_code})"
+    if "FB_PUBLIC_LOAD_DATA_" not in response.text:
+        return "indisponivel", "a página não trouxe o formulário (login exigido ou link errado)"
+    return "ok", "o formulário responde normalmente"
+
+
+# ==========================
+# PREENCHIMENTO EM LOTE (JAVASCRIPT)
+# ==========================
+
+# Localiza todos os campos da página em uma única chamada, logo após cada carregamento.
+# Recebe [[chave, "css"|"xpath", localizador], ...] e devolve {chave: [elemento, tipo]} só dos encontrados;
+# tipo: "texto" (input), "paragrafo" (textarea), "lista" (suspensa), "opcoes" (rádio/caixas) ou "outro".
+JS_RESOLVE_FIELDS = """
+const campos = arguments[0];
+const achados = {};
+const porXPath = (xp) => document.evaluate(xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const tipo = (el) => {
+    const tag = el.tagName.toLowerCase();
+    if (tag === 'input') return 'texto';
+    if (tag === 'textarea') return 'paragrafo';
+    if (el.closest('[role="listbox"]') || el.querySelector('[role="listbox"]')) return 'lista';
+    const role = el.getAttribute('role');
+    if (role === 'radiogroup' || role === 'list' || el.querySelector('[role="radio"],[role="checkbox"]')) return 'opcoes';
+    return 'outro';
+};
+for (const [chave, modo, localizador] of campos) {
+    let el = null;
+    try { el = modo === 'xpath' ? porXPath(localizador) : document.querySelector(localizador); } catch (e) { el = null; }
+    if (el) achados[chave] = [el, tipo(el)];
+}
+return achados;
+"""
+
+# Preenche todos os campos de texto de uma linha em uma única chamada ao navegador.
+# Recebe [[seletor, elemento (de JS_RESOLVE_FIELDS) ou null, valor], ...] e devolve um status por seletor:
+#   "ok" (preenchido), "vazio" (sem valor), "interativo" (lista/opção: precisa de clique),
+#   "ausente" (campo não encontrado na página).
+JS_BULK_FILL = """
+const campos = arguments[0];
+const status = {};
+const setter = (el) => Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set;
+for (const [seletor, el, valor] of campos) {
+    if (!el) { status[seletor] = 'ausente'; continue; }
+    const tag = el.tagName.toLowerCase();
+    if (tag !== 'input' && tag !== 'textarea') { status[seletor] = valor ? 'interativo' : 'vazio'; continue; }
+    if (!valor) { status[seletor] = 'vazio'; continue; }
+    el.focus();
+    setter(el).call(el, valor);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.blur();
+    status[seletor] = el.value === valor ? 'ok' : 'ausente';
+}
+return status;
+"""
+
+# Confere se os campos carregados pela URL pré-preenchida têm os valores esperados.
+# Recebe [[entry, seletor, esperado], ...] e devolve os seletores divergentes.
+JS_VERIFY_PREFILL = """
+const campos = arguments[0];
+const divergentes = [];
+const norm = (v) => (v || '').replace(/\\s+/g, ' ').trim();
+for (const [entry, seletor, esperado] of campos) {
+    if (!esperado) continue;
+    const valores = [];
+    document.querySelectorAll(`input[name="${entry}"]`).forEach((el) => valores.push(el.value));
+    const el = document.querySelector(seletor);
+    if (el) {
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'input' || tag === 'textarea') valores.push(el.value);
+        el.querySelectorAll('[aria-selected="true"][data-value], [aria-checked="true"][data-value]')
+            .forEach((opt) => valores.push(opt.getAttribute('data-value')));
+    }
+    if (!valores.some((v) => norm(v) === norm(esperado))) divergentes.push(seletor);
+}
+return divergentes;
+"""
+
+# Estado de uma lista suspensa após o clique: [menu aberto?, valor selecionado ou null]
+JS_DROPDOWN_STATE = """
+const el = arguments[0];
+const expanded = el.getAttribute('aria-expanded') === 'true';
+const opt = el.querySelector('[role="option"][aria-selected="true"]');
+return [expanded, opt ? (opt.getAttribute('data-value') || opt.textContent || '').trim() : null];
+"""
+
+# Se a opção (rádio/caixa) clicada já está marcada
+JS_OPTION_CHECKED = """
+const el = arguments[0];
+const box = el.closest('[role="radio"],[role="checkbox"]')
+    || (el.closest('label') || el).querySelector('[role="radio"],[role="checkbox"]');
+return box ? box.getAttribute('aria-checked') === 'true' : true;
+"""
+
+
+# ==========================
+# ÍNDICE DE OPÇÕES DAS LISTAS SUSPENSAS
+# ==========================
+
+# Textos (data-value) das opções de uma lista suspensa, na ordem da página, sem o "Escolher"
+JS_DROPDOWN_OPTIONS = """
+const el = arguments[0];
+const list = el.closest('[role="listbox"]') || el.querySelector('[role="listbox"]') || el;
+return Array.from(list.querySelectorAll('[role="option"]'))
+    .map((opt) => opt.getAttribute('data-value'))
+    .filter((v) => v);
+"""
+
+# Abre a lista e clica a opção pela posição em uma única chamada; false se a posição não
+# corresponder ao texto esperado (a página mudou) e o caminho por XPath deve ser usado
+JS_SELECT_OPTION = """
+const [el, posicao, valor] = arguments;
+const list = el.closest('[role="listbox"]') || el.querySelector('[role="listbox"]') || el;
+list.click();
+const opcoes = Array.from(list.querySelectorAll('[role="option"]')).filter((opt) => opt.getAttribute('data-value'));
+const alvo = opcoes[posicao];
+if (!alvo || alvo.getAttribute('data-value') !== valor) return false;
+alvo.click();
+return true;
+"""
+
+
+def build_option_index(options) -> dict:
+    """Valor -> posição da opção, pelo texto exato e pela forma normalizada (normalize_title).
+
+    Uma forma normalizada que coincide em duas opções diferentes só vale pelo texto exato.
+    """
+    index = {}
+    normalized = {}
+    for position, label in enumerate(options):
+        index.setdefault(label.strip(), position)
+        key = normalize_title(label)
+        normalized[key] = None if key in normalized else position
+    for key, position in normalized.items():
+        if position is not None:
+            index.setdefault(key, position)
+    return index
+
+
+def option_position(index: dict, value: str):
+    """Posição da opção para o valor da planilha, ou None se ele não for uma das opções."""
+    position = index.get(value.strip())
+    if position is None:
+        position = index.get(normalize_title(value))
+    return position
+
+
+# ==========================
+# MEDIÇÃO DE TEMPOS (RELATÓRIO)
+# ==========================
+
+REPORTS_DIR = APP_DIR / "relatorios"
+
+
+def percentile(values: list, pct: float) -> float:
+    """Percentil por posição mais próxima (lista não vazia)."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class RunTimings:
+    """Tempos por linha e por fase (carregar formulário, cada campo, envio...), medidos com perf_counter."""
+
+    def __init__(self):
+        self.rows = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, index: int, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(index, phase, time.perf_counter() - started)
+
+    def record(self, index: int, phase: str, seconds: float):
+        with self._lock:
+            phases = self.rows.setdefault(index + 1, {})
+            phases[phase] = phases.get(phase, 0.0) + seconds
+
+    def summary(self) -> dict:
+        """fase -> {n, p50, p95, max, total}."""
+        with self._lock:
+            by_phase = {}
+            for phases in self.rows.values():
+                for phase, seconds in phases.items():
+                    by_phase.setdefault(phase, []).append(seconds)
+        return {
+            phase: {
+                "n": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "max": max(values),
+                "total": sum(values),
+            }
+            for phase, values in by_phase.items()
+        }
+
+    def write_report(self, form_url: str, excel_path: str, extra: dict | None = None) -> Path:
+        """Grava o relatório JSON (resumo + tempos de cada linha + `extra`) em relatorios/ e retorna o caminho."""
+        REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = REPORTS_DIR / f"tempos_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        with self._lock:
+            rows = [{"linha": number, **phases} for number, phases in sorted(self.rows.items())]
+        report = {
+            "formulario": form_url,
+            "planilha": excel_path,
+            "gerado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "resumo": self.summary(),
+            **(extra or {}),
+            "linhas": rows,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return path
+
+
+# ==========================
+# POOL DE NAVEGADORES
+# ==========================
+
+# Limite de navegadores simultâneos no modo automático
+MAX_BROWSER_SESSIONS = 8
+# Memória reservada por instância do Chrome (MB) ao calcular o tamanho automático
+CHROME_MEMORY_MB = 700
+# Reaberturas seguidas do Chrome por sessão depois de quedas (o disjuntor costuma agir antes)
+SESSION_MAX_RESTARTS = 3
+
+# Intervalo de verificação das esperas explícitas (o padrão do Selenium é 0,5 s)
+FAST_POLL_INTERVAL = 0.05
+# Tempo máximo esperando o menu fechar/a opção ficar marcada depois de um clique
+SETTLE_TIMEOUT = 3
+# Espera padrão por elementos da página (formulário, campos, botões)
+PAGE_WAIT_TIMEOUT = 15
+
+# Serializa a abertura do Chrome quando o undetected_chromedriver precisa baixar/corrigir o driver
+_driver_start_lock = threading.Lock()
+
+# chromedriver já corrigido pelo undetected_chromedriver, um por versão principal do Chrome
+CHROMEDRIVER_CACHE_DIR = APP_DIR / "cache" / "chromedriver"
+CHROMEDRIVER_NAME = "undetected_chromedriver.exe" if sys.platform.startswith("win") else "undetected_chromedriver"
+
+
+def available_memory_mb():
+    """Memória física disponível em MB, ou None se não for possível descobrir."""
+    try:
+        if sys.platform.startswith("win"):
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("sullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+            return status.ullAvailPhys // (1024 * 1024)
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except Exception:
+        pass
+    return None
+
+
+def auto_pool_size() -> int:
+    """Quantos navegadores abrir em paralelo: um núcleo livre para a UI e memória para cada Chrome."""
+    size = max(1, (os.cpu_count() or 2) - 1)
+    memory = available_memory_mb()
+    if memory is not None:
+        size = min(size, max(1, memory // CHROME_MEMORY_MB))
+    return min(size, MAX_BROWSER_SESSIONS)
+
+
+@lru_cache(maxsize=1)
+def chrome_major_version():
+    """Versão principal do Chrome instalado (ex.: 120), sem abrir o navegador; None se não for possível descobrir."""
+    load_browser_modules()
+    try:
+        if sys.platform.startswith("win"):
+            import winreg
+            for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+                try:
+                    with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                        return int(winreg.QueryValueEx(key, "version")[0].split(".")[0])
+                except OSError:
+                    continue
+            # Sem registro: a pasta da versão fica ao lado do chrome.exe (ex.: 120.0.6099.71)
+            executable = uc.find_chrome_executable()
+            for entry in os.listdir(os.path.dirname(executable)) if executable else []:
+                if re.fullmatch(r"\d+\.\d+\.\d+\.\d+", entry):
+                    return int(entry.split(".")[0])
+            return None
+        executable = uc.find_chrome_executable()
+        if not executable:
+            return None
+        output = subprocess.run([executable, "--version"], capture_output=True, text=True, timeout=15).stdout
+        match = re.search(r"(\d+)\.\d+\.\d+", output)
+        return int(match.group(1)) if match else None
+    except Exception:
+        return None
+
+
+def cached_chromedriver(major):
+    """Caminho do chromedriver corrigido para esta versão do Chrome, se já estiver em cache."""
+    if not major:
+        return None
+    path = CHROMEDRIVER_CACHE_DIR / str(major) / CHROMEDRIVER_NAME
+    return path if path.is_file() else None
+
+
+def store_chromedriver(major, source: str):
+    """Guarda o chromedriver recém-corrigido e apaga os de versões anteriores do Chrome."""
+    if not major or not source or not os.path.isfile(source):
+        return
+    target_dir = CHROMEDRIVER_CACHE_DIR / str(major)
+    try:
+        target_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = target_dir / (CHROMEDRIVER_NAME + ".tmp")
+        shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, target_dir / CHROMEDRIVER_NAME)
+        for old_dir in CHROMEDRIVER_CACHE_DIR.iterdir():
+            if old_dir.is_dir() and old_dir.name != str(major):
+                shutil.rmtree(old_dir, ignore_errors=True)
+    except OSError:
+        pass
+
+
+def chrome_options(headless: bool):
+    # Um objeto por abertura: o undetected_chromedriver não aceita reaproveitar as opções
+    options = Options()
+    options.add_argument('--ignore-certificate-errors')
+    # "eager": driver.get() volta no DOMContentLoaded; o motor sempre espera explicitamente pelo que usa
+    options.page_load_strategy = "eager"
+    # Log de desempenho (eventos de rede) para medir o que o bloqueio de recursos evitou
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if headless:
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1920,1080')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+    return options
+
+
+def launch_chrome(headless: bool):
+    """Abre uma instância do Chrome com as opções do app.
+
+    Com o chromedriver da versão instalada já em cache, o undetected_chromedriver não
+    baixa nem corrige nada (funciona offline) e várias sessões podem abrir ao mesmo tempo.
+    """
+    load_browser_modules()
+    major = chrome_major_version()
+    driver = None
+    cached = cached_chromedriver(major)
+    if cached is not None:
+        try:
+            driver = uc.Chrome(options=chrome_options(headless), driver_executable_path=str(cached), version_main=major)
+        except Exception:
+            # Driver em cache recusado (corrompido ou incompatível): volta ao download normal
+            shutil.rmtree(cached.parent, ignore_errors=True)
+
+    if driver is None:
+        # O undetected_chromedriver baixa e corrige o binário do driver ao abrir; em paralelo isso conflita
+        with _driver_start_lock:
+            cached = cached_chromedriver(major)  # outra sessão pode ter preenchido o cache enquanto esta esperava
+            if cached is not None:
+                driver = uc.Chrome(options=chrome_options(headless), driver_executable_path=str(cached), version_main=major)
+            else:
+                driver = uc.Chrome(options=chrome_options(headless), version_main=major)
+                store_chromedriver(major, getattr(driver.patcher, "executable_path", ""))
+    try:
+        driver.maximize_window()
+    except Exception:
+        pass
+    return driver
+
+
+# ==========================
+# BLOQUEIO DE RECURSOS (PERFIL DE DESEMPENHO)
+# ==========================
+
+# Recursos que o preenchimento não usa, bloqueados via DevTools (Network.setBlockedURLs; '*' é curinga)
+BLOCKED_RESOURCE_PATTERNS = [
+    # Imagens
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    # Fontes
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    # Mídia
+    "*.mp4", "*.webm", "*.mp3",
+    # Analytics e terceiros
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*play.google.com/log*",
+]
+# Um padrão (ou trecho dele, ex.: "fonts.gstatic.com" ou "*.svg") por linha: esses não são bloqueados
+RESOURCE_ALLOWLIST_FILE = APP_DIR / "bloqueio_permitidos.txt"
+
+
+def resource_block_patterns(extra_allowlist=()) -> list:
+    """BLOCKED_RESOURCE_PATTERNS menos os padrões liberados no arquivo de permitidos e em extra_allowlist."""
+    allowed = [a.strip() for a in extra_allowlist if a.strip()]
+    try:
+        with open(RESOURCE_ALLOWLIST_FILE, "r", encoding="utf-8") as f:
+            allowed += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except OSError:
+        pass
+    return [p for p in BLOCKED_RESOURCE_PATTERNS if not any(a in p for a in allowed)]
+
+
+def set_blocked_urls(driver, patterns) -> bool:
+    """Aplica (ou, com lista vazia, remove) o bloqueio de URLs no navegador."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+        return True
+    except Exception:
+        return False
+
+
+class NetworkStats:
+    """Soma os eventos de rede do log de desempenho do Chrome: o que foi baixado e o que foi bloqueado.
+
+    Os bytes evitados são estimados pelo tamanho médio dos recursos bloqueáveis que
+    ainda foram baixados (a primeira carga de cada sessão é feita sem bloqueio).
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = 0
+        self._sample_requests = 0   # recursos bloqueáveis baixados (base da estimativa)
+        self._sample_bytes = 0
+        self._urls = {}
+        self._lock = threading.Lock()
+
+    def _blockable(self, url: str) -> bool:
+        return any(fnmatch.fnmatchcase(url, p) for p in self.patterns)
+
+    def collect(self, driver):
+        """Esvazia o log de desempenho do navegador e acumula os números."""
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            return
+        with self._lock:
+            for entry in entries:
+                try:
+                    message = json.loads(entry["message"])["message"]
+                except (KeyError, TypeError, ValueError):
+                    continue
+                method = message.get("method")
+                params = message.get("params") or {}
+                key = (id(driver), params.get("requestId"))
+                if method == "Network.requestWillBeSent":
+                    self._urls[key] = (params.get("request") or {}).get("url", "")
+                elif method == "Network.loadingFinished":
+                    size = int(params.get("encodedDataLength") or 0)
+                    self.requests += 1
+                    self.bytes += size
+                    if self._blockable(self._urls.pop(key, "")):
+                        self._sample_requests += 1
+                        self._sample_bytes += size
+                elif method == "Network.loadingFailed":
+                    self._urls.pop(key, None)
+                    if params.get("blockedReason"):
+                        self.blocked += 1
+
+    def bytes_avoided(self) -> int:
+        if not self._sample_requests:
+            return 0
+        return int(self.blocked * self._sample_bytes / self._sample_requests)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "requisicoes_baixadas": self.requests,
+                "bytes_baixados": self.bytes,
+                "requisicoes_bloqueadas": self.blocked,
+                "bytes_evitados_estimados": self.bytes_avoided(),
+            }
+
+
+# ==========================
+# NAVEGADORES AQUECIDOS (REAPROVEITADOS ENTRE EXECUÇÕES)
+# ==========================
+
+# Execuções atendidas por um mesmo Chrome antes de ele ser reciclado (limita o acúmulo de memória)
+WARM_BROWSER_MAX_RUNS = 20
+
+
+class BrowserSessionManager:
+    """Guarda navegadores já abertos para a próxima execução, evitando reabrir o Chrome a cada clique.
+
+    Pertence à janela (dura o app inteiro); cada execução pega os navegadores com
+    acquire() e os devolve com release(). Um navegador só é entregue depois de
+    responder a um teste rápido, e é reciclado se falhar, mudar o modo headless
+    ou atingir WARM_BROWSER_MAX_RUNS.
+    """
+
+    def __init__(self, max_idle: int = MAX_BROWSER_SESSIONS):
+        self.max_idle = max_idle
+        self._idle = []        # [(driver, headless)]
+        self._runs = {}        # driver -> execuções atendidas
+        self._launching = 0    # aberturas em segundo plano ainda em andamento
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        try:
+            driver.window_handles
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def idle_count(self) -> int:
+        with self._cond:
+            return len(self._idle) + self._launching
+
+    def warm_up(self, headless: bool, count: int = 1):
+        """Abre navegadores em segundo plano até haver `count` disponíveis (ou abrindo)."""
+        with self._cond:
+            if self._closed:
+                return
+            missing = count - len([d for d, h in self._idle if h == headless]) - self._launching
+            self._launching += max(0, missing)
+        for _ in range(max(0, missing)):
+            threading.Thread(target=self._launch_idle, args=(headless,), daemon=True).start()
+
+    def _launch_idle(self, headless: bool):
+        driver = None
+        try:
+            driver = launch_chrome(headless)
+        except Exception:
+            pass
+        with self._cond:
+            self._launching -= 1
+            keep = driver is not None and not self._closed
+            if keep:
+                self._idle.append((driver, headless))
+                self._runs.setdefault(driver, 0)
+            self._cond.notify_all()
+        if driver is not None and not keep:
+            self._quit(driver)
+
+    def acquire(self, headless: bool):
+        """Entrega um navegador aquecido e saudável no modo pedido, ou None (quem chamou abre um novo)."""
+        while True:
+            with self._cond:
+                # Um aquecimento em andamento costuma terminar antes de um Chrome novo abrir
+                while not self._idle and self._launching and not self._closed:
+                    self._cond.wait()
+                if self._closed or not self._idle:
+                    return None
+                matching = [item for item in self._idle if item[1] == headless]
+                if not matching:
+                    # Modo headless mudou: os aquecidos no outro modo não servem mais
+                    stale, self._idle = self._idle, []
+                else:
+                    self._idle.remove(matching[0])
+                    stale = []
+            for driver, _ in stale:
+                self._forget(driver)
+                self._quit(driver)
+            if not matching:
+                return None
+            driver = matching[0][0]
+            if self.is_healthy(driver):
+                return driver
+            self._forget(driver)
+            self._quit(driver)
+
+    def release(self, driver, headless: bool):
+        """Devolve o navegador após a execução; fecha-o se não estiver saudável ou se já foi muito usado."""
+        with self._cond:
+            runs = self._runs.get(driver, 0) + 1
+            keep = not self._closed and runs < WARM_BROWSER_MAX_RUNS and len(self._idle) < self.max_idle
+        if keep and self.is_healthy(driver):
+            with self._cond:
+                if not self._closed:
+                    self._runs[driver] = runs
+                    self._idle.append((driver, headless))
+                    self._cond.notify_all()
+                    return
+        self._forget(driver)
+        self._quit(driver)
+
+    def _forget(self, driver):
+        with self._cond:
+            self._runs.pop(driver, None)
+
+    @classmethod
+    def quit_in_background(cls, drivers, daemon: bool = True):
+        """Fecha os navegadores em uma thread própria (driver.quit() leva segundos e travaria a janela)."""
+        if not drivers:
+            return
+        def quit_all():
+            for driver in drivers:
+                cls._quit(driver)
+        threading.Thread(target=quit_all, daemon=daemon).start()
+
+    def clear(self) -> list:
+        """Retira os navegadores guardados e os devolve para quem chamou fechar (quit_in_background).
+
+        Os próximos acquire() devolvem None até um novo warm_up().
+        """
+        with self._cond:
+            idle, self._idle = self._idle, []
+            for driver, _ in idle:
+                self._runs.pop(driver, None)
+        return [driver for driver, _ in idle]
+
+    def shutdown(self) -> list:
+        """Recusa novos navegadores (ao sair do app) e devolve os guardados, como clear()."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        return self.clear()
+
+
+# ==========================
+# SAÚDE DOS SELETORES (FALHA RÁPIDA)
+# ==========================
+
+# Cada procura começa por uma sonda curta; a espera longa (PAGE_WAIT_TIMEOUT) é gasta uma única vez por seletor
+SELECTOR_PROBE_TIMEOUT = 2.0
+# Falhas seguidas até o seletor ser dado como quebrado na execução (e pulado na hora)
+SELECTOR_BROKEN_AFTER = 3
+
+
+def title_locator(column_name: str) -> tuple:
+    """Localizador alternativo: o campo preenchível da pergunta cujo título é a própria coluna."""
+    return (By.XPATH, (
+        f'//div[@role="listitem"][.//div[@role="heading"]//*[normalize-space(text())="{column_name}"]]'
+        '//*[self::input[not(@type="hidden")] or self::textarea'
+        ' or @role="listbox" or @role="radiogroup" or @role="list"][1]'
+    ))
+
+
+class SelectorHealth:
+    """Cache negativo, por execução, dos seletores de campo que não aparecem na página.
+
+    Para cada seletor guarda as falhas seguidas, se a espera longa já foi usada,
+    um localizador alternativo que tenha dado certo e o tempo perdido procurando
+    por ele (relatado no fim da execução). Compartilhado entre os navegadores.
+    """
+
+    def __init__(self, broken_after: int = SELECTOR_BROKEN_AFTER):
+        self.broken_after = broken_after
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def state(self, selector: str, column_name: str) -> dict:
+        with self._lock:
+            return self._state.setdefault(selector, {
+                "coluna": column_name, "falhas": 0, "espera_longa": False,
+                "quebrado": False, "alternativo": None, "perdido": 0.0,
+            })
+
+    def claim_long_wait(self, selector: str) -> bool:
+        """True só para a primeira procura que falhar na sonda curta (as demais não esperam de novo)."""
+        with self._lock:
+            state = self._state[selector]
+            if state["espera_longa"]:
+                return False
+            state["espera_longa"] = True
+            return True
+
+    def found(self, selector: str, seconds_lost: float, alternate=None):
+        with self._lock:
+            state = self._state[selector]
+            state["falhas"] = 0
+            state["perdido"] += seconds_lost
+            if alternate is not None:
+                state["alternativo"] = alternate
+
+    def missed(self, selector: str, seconds_lost: float) -> bool:
+        """Registra a falha; True se o seletor acabou de ser dado como quebrado."""
+        with self._lock:
+            state = self._state[selector]
+            state["falhas"] += 1
+            state["perdido"] += seconds_lost
+            if not state["quebrado"] and state["falhas"] >= self.broken_after:
+                state["quebrado"] = True
+                return True
+            return False
+
+    def summary(self) -> list:
+        """Seletores que custaram tempo ou foram trocados, do mais caro para o mais barato."""
+        with self._lock:
+            items = [
+                {"seletor": selector, "coluna": s["coluna"], "segundos_perdidos": round(s["perdido"], 2),
+                 "quebrado": s["quebrado"], "alternativo": s["alternativo"][1] if s["alternativo"] else None}
+                for selector, s in self._state.items()
+                if s["perdido"] >= 0.5 or s["quebrado"] or s["alternativo"]
+            ]
+        return sorted(items, key=lambda item: -item["segundos_perdidos"])
+
+
+# ==========================
+# MOTOR DA AUTOMAÇÃO (NAVEGADOR)
+# ==========================
+
+class FormsEngine:
+    """Preenche o formulário linha a linha com um pool de navegadores, sem depender do Qt.
+
+    A saída vai para os ganchos on_log/on_progress/on_status/on_tally/on_circuit/on_finished,
+    substituídos pela CLI (stdout) ou pelo FormsWorker (sinais da janela).
+    """
+
+    def __init__(self, form_url: str, excel_path: str, field_mapping: dict, headless: bool, keep_open: bool, pool_size: int = 1, resume: bool = True, js_fill: bool = True, prefill: bool = True, browser_pool: BrowserSessionManager | None = None, block_resources: bool = True, resource_allowlist=(), value_formats: ValueFormats | None = None, breaker: CircuitBreaker | None = None, pause_on_trip: bool = True):
+        self.form_url = form_url.strip()
+        self.excel_path = excel_path.strip()
+        self.field_mapping = field_mapping or {}
+        self.headless = headless
+        self.keep_open = keep_open
+        self.pool_size = pool_size  # 0 = automático (CPU/RAM)
+        self.resume = resume        # pula linhas já confirmadas no diário de envios
+        self.js_fill = js_fill      # campos de texto preenchidos em lote via JavaScript
+        self.prefill = prefill      # cada linha abre a URL pré-preenchida (entry.<id>=valor)
+        self.browser_pool = browser_pool  # navegadores aquecidos da janela (None = abre e fecha a cada execução)
+        # Imagens, fontes e analytics bloqueados via DevTools (perfil de desempenho)
+        self.network = NetworkStats(resource_block_patterns(resource_allowlist) if block_resources else [])
+        self.form_fields = {}       # coluna -> campo do esquema do formulário
+        self.value_formats = value_formats or ValueFormats()  # texto enviado para números/datas
+        self._value_index = {}      # coluna -> posição na tupla de valores de cada linha
+        self.quarantine = {}        # linha -> problemas encontrados na pré-validação (não é enviada)
+        self.retries = RetryQueue()  # linhas com falha aguardando nova tentativa ou a passada final
+        self.failed_rows = []       # linhas que esgotaram as tentativas (arquivo de quarentena)
+        self.breaker = breaker or CircuitBreaker()
+        self.selectors = SelectorHealth()  # seletores que falharam nesta execução (falha rápida)
+        self._option_indexes = {}   # seletor da lista -> (opções, índice valor -> posição), lido uma vez por execução
+        self._options_lock = threading.Lock()
+        self.pause_on_trip = pause_on_trip  # formulário no ar, mas tudo falhando: pausa (True) ou aborta
+        self._running = threading.Event()   # limpo enquanto o disjuntor segura novas linhas
+        self._running.set()
+        self._resume_requested = threading.Event()
+        self._breaker_lock = threading.Lock()
+        self._abort_reason = ""
+        self._in_flight = 0
+        self._recovered = 0
+        self.journal = None
+        self._skipped = 0
+        self._stop_event = threading.Event()
+        self.drivers = []
+        self._drivers_lock = threading.Lock()
+        self._thread_local = threading.local()
+        self._tally_lock = threading.Lock()
+        self._successes = 0
+        self._failures = 0
+        self._rows_taken = 0
+        self._sessions_started = 0
+        self._fatal_error = ""
+        self._sheet_error = False
+        self._feed_done = threading.Event()
+        self._ready = threading.Event()            # planilha e formulário validados
+        self._startup_aborted = threading.Event()  # validação falhou: navegadores já abertos devem fechar
+        self._sleeps_avoided = 0
+        self.timings = RunTimings()
+        self._sleep_seconds_avoided = 0.0
+        self._total = 0
+
+    # Ganchos de saída; por padrão não fazem nada
+    def on_log(self, text: str):
+        pass
+
+    def on_progress(self, current: int, total: int):
+        pass
+
+    def on_status(self, text: str):
+        pass
+
+    def on_tally(self, successes: int, failures: int):
+        pass
+
+    def on_finished(self, successes: int, failures: int, reason: str):
+        pass
+
+    def on_circuit(self, state: str, detail: str):
+        """Estado do disjuntor: "aberto" (verificando), "pausado" ou "fechado" (execução normal)."""
+        pass
+
+    def continue_run(self):
+        """Retoma uma execução pausada pelo disjuntor."""
+        self._resume_requested.set()
+
+    def abort(self, reason: str):
+        """Interrompe a execução por decisão do motor; `reason` vira o motivo final."""
+        self._abort_reason = reason
+        self.request_stop()
+
+    def _stop_reason(self) -> str:
+        return self._abort_reason or "parado pelo usuário"
+
+    def request_stop(self):
+        # Sinaliza a parada e tenta forçar o fechamento de todos os navegadores imediatamente
+        self._stop_event.set()
+        self.on_log("🛑 Parada solicitada. Tentando fechar o(s) navegador(es)...")
+        with self._drivers_lock:
+            drivers, self.drivers = self.drivers, []
+        for driver in drivers:
+            try:
+                # O quit() é crucial para interromper chamadas bloqueantes do Selenium (wait.until, driver.get)
+                driver.quit()
+            except Exception:
+                pass
+
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def _log(self, text: str):
+        """Envia o log prefixado com o navegador da thread atual (quando há mais de um)."""
+        self.on_log(getattr(self._thread_local, "prefix", "") + text)
+
+    def _read_sheet(self):
+        """Abre a planilha em streaming e valida o cabeçalho. Retorna None (já chamando on_finished) em caso de erro."""
+        try:
+            self.on_status("📚 Lendo arquivo Excel...")
+            sheet = SheetStream(self.excel_path, self.field_mapping.values())
+            if sheet.missing:
+                sheet.close()
+                self.on_log(f"🚨 ERRO CRÍTICO: Colunas mapeadas não encontradas: {', '.join(sheet.missing)}")
+                self.on_finished(0, 0, "colunas ausentes")
+                return None
+            self.on_log(f"📊 Planilha aberta com sucesso. Aproximadamente {sheet.total} registros.")
+            self._value_index = sheet.column_index
+            return sheet
+        except FileNotFoundError:
+            self.on_finished(0, 0, "arquivo não encontrado")
+            return None
+        except Exception as e:
+            self.on_log(f"🚨 ERRO ao ler a planilha: {e}")
+            self.on_finished(0, 0, "erro leitura planilha")
+            return None
+
+    def _load_form_fields(self, session=None):
+        """Lê o esquema do formulário (com cache) e associa cada coluna mapeada a uma pergunta.
+
+        Retorna coluna -> campo do esquema, {} se o esquema não pôde ser lido, ou
+        None (já chamando on_finished) se alguma coluna não corresponde a nenhuma pergunta.
+        """
+        self.on_status("🧩 Lendo estrutura do formulário...")
+        try:
+            schema, source = get_form_schema(self.form_url, session)
+        except Exception as e:
+            self.on_log(f"⚠️ Não foi possível ler a estrutura do formulário: {e}")
+            return {}
+
+        matched, unmatched = match_columns_to_schema(self.field_mapping, schema)
+        if unmatched:
+            self.on_log(f"🚨 ERRO CRÍTICO: Colunas sem pergunta correspondente no formulário: {', '.join(unmatched)}")
+            self.on_finished(0, 0, "colunas sem pergunta")
+            return None
+
+        self.on_log(f"🧩 Estrutura do formulário lida ({source}): {len(schema['fields'])} perguntas.")
+        return matched
+
+    def _open_journal(self):
+        """Abre o diário de envios do formulário; sem ele a execução segue, apenas sem retomada."""
+        try:
+            self.journal = SubmissionJournal(form_id_from_url(self.form_url))
+        except Exception as e:
+            self.on_log(f"⚠️ Diário de envios indisponível (sem retomada): {e}")
+            self.journal = None
+            return
+        if self.resume and self.journal.sent:
+            self.on_log(f"📒 Diário de envios: {len(self.journal.sent)} registros já confirmados serão pulados.")
+
+    def _normalize(self, chunk):
+        return self.value_formats.normalize(chunk, self.form_fields)
+
+    def _row_key(self, raw):
+        """Identidade da linha no diário, ou None se o registro já foi enviado (e deve ser pulado).
+
+        Usa as células cruas da planilha (não o texto normalizado nem os valores
+        do DataFrame), então a chave não muda com o formato de envio nem com as
+        células vizinhas do mesmo bloco.
+        """
+        if self.journal is None:
+            return ""
+        key = self.journal.key_for(raw[self._value_index[column]] for column in self.field_mapping.values())
+        if self.resume and self.journal.is_sent(key):
+            with self._tally_lock:
+                self._skipped += 1
+            return None
+        return key
+
+    def _preflight(self):
+        """Lê a planilha inteira uma vez, em blocos, e separa as linhas que o formulário recusaria."""
+        if not self.form_fields:
+            return
+        self.on_status("🧪 Pré-validando a planilha...")
+        problems = {}
+        sheet = SheetStream(self.excel_path, self.form_fields.keys())
+        try:
+            for chunk in sheet.iter_chunks():
+                if self.stopped():
+                    return
+                problems.update(preflight_problems(self._normalize(chunk), self.form_fields))
+        finally:
+            sheet.close()
+
+        self.quarantine = problems
+        if not problems:
+            self.on_log("🧪 Pré-validação: nenhum problema encontrado na planilha.")
+            return
+        self.on_log(f"🧪 Pré-validação: {len(problems)} registro(s) com problemas serão pulados (quarentena).")
+        try:
+            REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+            path = REPORTS_DIR / f"prevalidacao_{time.strftime('%Y%m%d_%H%M%S')}.json"
+            report = {
+                "formulario": self.form_url,
+                "planilha": self.excel_path,
+                "gerado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "registros": [{"registro": index + 1, "problemas": p} for index, p in sorted(problems.items())],
+            }
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.on_log(f"📄 Lista de problemas por registro salva em: {path}")
+        except OSError as e:
+            self.on_log(f"⚠️ Não foi possível salvar a lista de problemas: {e}")
+
+    def _quarantined(self, index: int) -> bool:
+        """True (já registrando a falha) se a linha foi barrada na pré-validação."""
+        problems = self.quarantine.get(index)
+        if not problems:
+            return False
+        self.on_log(f"Registro {index + 1}: 🚫 EM QUARENTENA — {'; '.join(problems)}")
+        self._count_result(False)
+        return True
+
+    def _record(self, key: str, ok: bool, index: int):
+        if self.journal is not None and key:
+            self.journal.record(key, ok, index + 1)
+
+    def _row_succeeded(self, item):
+        index, _, key, attempt = item
+        if attempt > 1:
+            with self._tally_lock:
+                self._recovered += 1
+        self._record(key, True, index)
+        self._count_result(True)
+        self._breaker_result(True)
+
+    def _row_failed(self, item, failure: RowFailure):
+        """Destino de uma linha que falhou: nova tentativa, passada final ou quarentena (falha definitiva)."""
+        index, row, key, attempt = item
+        retry = (index, row, key, attempt + 1)
+        if failure.transient and attempt < RETRY_MAX_ATTEMPTS:
+            delay = self.retries.schedule(retry, attempt)
+            self._log(f"  -> 🔁 Falha transitória: {failure.reason}. Nova tentativa em {delay:.1f} s ({attempt + 1}/{RETRY_MAX_ATTEMPTS}).")
+        elif failure.transient and attempt == RETRY_MAX_ATTEMPTS:
+            self.retries.defer(retry)
+            self._log(f"  -> 🔁 Falha transitória: {failure.reason}. A linha volta na passada final.")
+        else:
+            self._give_up(item, failure)
+        self._breaker_result(False)
+
+    def _give_up(self, item, failure: RowFailure):
+        """Falha definitiva: conta, registra no diário e guarda a linha para o arquivo de quarentena."""
+        index, row, key, attempt = item
+        self._log(f"Registro {index + 1}: 🚫 Falha definitiva após {attempt} tentativa(s): {failure.reason}.")
+        self._record(key, False, index)
+        self._count_result(False)
+        values = {column: row[position] for column, position in self._value_index.items()}
+        with self._tally_lock:
+            self.failed_rows.append({"registro": index + 1, "tentativas": attempt, "motivo": failure.reason, "valores": values})
+
+    def _fail_unsent(self, rows: queue.Queue):
+        """Todas as sessões caíram com linhas por enviar: o resto da planilha vira falha explícita (quarentena)."""
+        cause = self._fatal_error or "sessões encerradas"
+        self.on_log(f"\n🚨 Nenhum navegador restante ({cause}): as linhas não enviadas serão registradas como falha.")
+        failure = RowFailure(f"nenhum navegador disponível ({cause})", False)
+        while not self.stopped():
+            try:
+                index, row, key, attempt = rows.get(timeout=0.2)
+            except queue.Empty:
+                if self._feed_done.is_set() and rows.empty():
+                    return
+                continue
+            self._give_up((index, row, key, attempt - 1), failure)
+
+    def _abandon_retries(self):
+        """Linhas que ainda aguardavam nova tentativa quando não havia mais quem as enviasse."""
+        if self.stopped() and not self._abort_reason:
+            return  # parada do usuário: o diário retoma essas linhas na próxima execução
+        for index, row, key, attempt in self.retries.drain():
+            self._give_up((index, row, key, attempt - 1), RowFailure("execução encerrada antes da nova tentativa", False))
+
+    def _breaker_result(self, ok: bool):
+        """Alimenta o disjuntor; se ele disparar, esta thread sonda o formulário e decide entre pausar e abortar."""
+        if self.stopped() or not self._running.is_set():
+            return  # tentativas que terminam durante a pausa não contam
+        reason = self.breaker.record(ok)
+        if reason is None or not self._breaker_lock.acquire(blocking=False):
+            return
+        try:
+            self._trip(reason)
+        finally:
+            self._breaker_lock.release()
+
+    def _trip(self, reason: str):
+        self._running.clear()
+        self._resume_requested.clear()
+        self.on_log(f"\n⚡ DISJUNTOR: {reason}. Novas linhas suspensas; verificando o formulário...")
+        self.on_circuit("aberto", reason)
+        self.on_status("⚡ Muitas falhas: verificando o formulário...")
+        state, detail = probe_form(self.form_url, getattr(self, "session", None))
+        while not self.stopped():
+            if state == "ok":
+                detail = f"{reason}, mas {detail} (layout ou dados mudaram?)"
+            if state in ("fechado", "indisponivel") or (state == "ok" and not self.pause_on_trip):
+                self.on_log(f"🛑 DISJUNTOR: {detail}. Execução abortada em vez de esperar o tempo limite de cada linha restante.")
+                self.abort("formulário fechado" if state == "fechado" else f"disjuntor: {reason}")
+                return
+            if state == "rede":
+                message = f"{detail}. Nova verificação a cada {BREAKER_PROBE_INTERVAL:.0f} s"
+            else:
+                message = f"{detail}. Confira e clique em Retomar ou Parar"
+            self.on_log(f"⏸️ DISJUNTOR: execução pausada — {message}.")
+            self.on_circuit("pausado", message)
+            self.on_status(f"⏸️ Pausado: {message}")
+            if self._wait_for_resume(BREAKER_PROBE_INTERVAL if state == "rede" else None):
+                break
+            if self.stopped():
+                return
+            state, detail = probe_form(self.form_url, getattr(self, "session", None))
+            if state == "ok":
+                break  # acesso restabelecido: retoma sozinho
+        else:
+            return
+        self.breaker.reset()
+        self._running.set()
+        self.on_log("▶️ DISJUNTOR: execução retomada.")
+        self.on_circuit("fechado", "")
+
+    def _wait_for_resume(self, timeout: float | None) -> bool:
+        """Espera o pedido de retomada; False ao fim do prazo ou em caso de parada."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.stopped():
+            if self._resume_requested.wait(0.2):
+                self._resume_requested.clear()
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return False
+
+    def _write_failed_rows(self):
+        """Resume as novas tentativas e grava o arquivo de quarentena das linhas que não foram enviadas."""
+        if self._recovered:
+            self.on_log(f"🔁 {self._recovered} registro(s) enviados em uma nova tentativa.")
+        if not self.failed_rows:
+            return
+        try:
+            REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+            path = REPORTS_DIR / f"quarentena_{time.strftime('%Y%m%d_%H%M%S')}.json"
+            report = {
+                "formulario": self.form_url,
+                "planilha": self.excel_path,
+                "gerado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "registros": sorted(self.failed_rows, key=lambda r: r["registro"]),
+            }
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.on_log(f"📄 {len(self.failed_rows)} registro(s) não enviados salvos em: {path}")
+        except OSError as e:
+            self.on_log(f"⚠️ Não foi possível salvar o arquivo de quarentena: {e}")
+
+    def _close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+        if self._skipped:
+            self.on_log(f"⏭️ {self._skipped} registros já enviados em execuções anteriores foram pulados.")
+
+    def _note_sleep_avoided(self, seconds: float):
+        with self._tally_lock:
+            self._sleeps_avoided += 1
+            self._sleep_seconds_avoided += seconds
+
+    def _option_index(self, driver, selector: str, column_name: str, field) -> tuple:
+        """(opções, índice) da lista suspensa: do esquema do formulário ou lidas da página na primeira vez."""
+        with self._options_lock:
+            cached = self._option_indexes.get(selector)
+        if cached is not None:
+            return cached
+        schema = self.form_fields.get(column_name) or {}
+        if schema.get("type") == "lista" and schema.get("options"):
+            labels = [o.strip() for o in schema["options"]]
+        else:
+            try:
+                labels = [o.strip() for o in driver.execute_script(JS_DROPDOWN_OPTIONS, field) or []]
+            except WebDriverException:
+                if self.stopped():
+                    raise
+                return [], {}  # tenta ler de novo na próxima linha
+        cached = (labels, build_option_index(labels))
+        with self._options_lock:
+            cached = self._option_indexes.setdefault(selector, cached)
+        if labels:
+            self._log(f"  -> 📋 '{column_name}': {len(labels)} opções indexadas para esta execução.")
+        return cached
+
+    def _unknown_option(self, driver, row, pending: dict, resolved: dict) -> RowFailure | None:
+        """Confere os valores das listas suspensas contra o índice de opções antes de preencher a linha."""
+        for selector, column_name in pending.items():
+            element, kind = resolved.get(selector, (None, None))
+            valor = self._row_value(row, column_name)
+            if kind != "lista" or not valor:
+                continue
+            labels, index = self._option_index(driver, selector, column_name, element)
+            if not labels or option_position(index, valor) is not None:
+                continue
+            close = difflib.get_close_matches(valor, labels, n=1, cutoff=0.6)
+            hint = f" (quis dizer '{close[0]}'?)" if close else ""
+            return RowFailure(f"'{column_name}': '{valor}' não é uma opção da lista{hint}", False)
+        return None
+
+    def _select_indexed_option(self, driver, selector: str, column_name: str, field, valor: str) -> bool:
+        """Seleciona a opção da lista pela posição no índice, em um único execute_script."""
+        labels, index = self._option_index(driver, selector, column_name, field)
+        position = option_position(index, valor)
+        if position is None:
+            return False
+        label = labels[position]
+        if not driver.execute_script(JS_SELECT_OPTION, field, position, label):
+            return False
+        settled = self._wait_dropdown_settled(field, label)
+        if settled is False:
+            return False
+        if settled is None:
+            self._log(f"  -> ⚠️ '{label}' escolhido (opção {position + 1}), mas a página não confirmou a seleção; o envio valida o campo.")
+            return True
+        self._log(f"  -> ✅ Selecionado '{label}' (opção {position + 1} da lista).")
+        return True
+
+    def _wait_dropdown_settled(self, field, valor: str) -> bool | None:
+        """Espera o menu fechar com a opção escolhida (substitui a pausa fixa de 0,3 s).
+
+        True só com a seleção confirmada (== valor); None se o menu fechou sem
+        opção legível (fica para a validação do envio); False se não fechar ou
+        ficar com outra opção.
+        """
+        def settled(driver):
+            expanded, selected = driver.execute_script(JS_DROPDOWN_STATE, field)
+            if expanded:
+                return False
+            return "ok" if selected == valor else ("indefinido" if selected is None else False)
+
+        started = time.perf_counter()
+        try:
+            state = WebDriverWait(field.parent, SETTLE_TIMEOUT, poll_frequency=FAST_POLL_INTERVAL).until(settled)
+            return True if state == "ok" else None
+        except TimeoutException:
+            return False
+        finally:
+            self._note_sleep_avoided(max(0.0, 0.3 - (time.perf_counter() - started)))
+
+    def _wait_option_checked(self, option):
+        """Espera a opção clicada ficar marcada (substitui a pausa fixa de 0,3 s)."""
+        started = time.perf_counter()
+        try:
+            WebDriverWait(option.parent, SETTLE_TIMEOUT, poll_frequency=FAST_POLL_INTERVAL).until(
+                lambda driver: driver.execute_script(JS_OPTION_CHECKED, option)
+            )
+        except TimeoutException:
+            pass
+        self._note_sleep_avoided(max(0.0, 0.3 - (time.perf_counter() - started)))
+
+    def _write_timing_report(self):
+        """Grava o relatório de tempos da execução e resume as fases no log."""
+        summary = self.timings.summary()
+        if not summary:
+            return
+        self.on_log("\n⏱️ Tempos por fase (p50 / p95 / máx, em segundos):")
+        for phase, stats in sorted(summary.items(), key=lambda item: -item[1]["total"]):
+            self.on_log(f"  {phase}: {stats['p50']:.3f} / {stats['p95']:.3f} / {stats['max']:.3f}  (n={stats['n']})")
+        try:
+            path = self.timings.write_report(self.form_url, self.excel_path, self._report_extra())
+            self.on_log(f"📄 Relatório de tempos salvo em: {path}")
+        except OSError as e:
+            self.on_log(f"⚠️ Não foi possível salvar o relatório de tempos: {e}")
+
+    def _report_extra(self) -> dict:
+        """Seções adicionais do relatório de tempos."""
+        return {"rede": self.network.summary(), "seletores": self.selectors.summary()}
+
+    def _log_wait_summary(self):
+        if self._sleeps_avoided:
+            self.on_log(
+                f"⏱️ Pausas fixas substituídas por esperas de eventos: {self._sleeps_avoided} "
+                f"(≈ {self._sleep_seconds_avoided:.1f} s economizados)."
+            )
+
+    def _probe(self, driver, locator: tuple, timeout: float):
+        """Elemento do localizador, esperando no máximo `timeout` segundos; None se não aparecer."""
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=FAST_POLL_INTERVAL).until(
+                EC.presence_of_element_located(locator)
+            )
+        except TimeoutException:
+            return None
+
+    def _alternate_locators(self, entry_selector: str, column_name: str) -> list:
+        """Outros jeitos de achar o campo: o seletor do esquema (ancorado no entry) e o título da pergunta."""
+        locators = [(By.CSS_SELECTOR, entry_selector)]
+        field = self.form_fields.get(column_name)
+        if field:
+            locators.append((By.CSS_SELECTOR, schema_field_selector(field)))
+        locators.append(title_locator(column_name))
+        return list(dict.fromkeys(locators))
+
+    def _find_field(self, driver, entry_selector: str, column_name: str):
+        """Localiza o campo com falha rápida; None se ele não estiver na página.
+
+        Sonda curta primeiro; a espera longa só na primeira falha do seletor na
+        execução; depois os localizadores alternativos. Seletores quebrados
+        (SELECTOR_BROKEN_AFTER falhas seguidas) nem são procurados.
+        """
+        state = self.selectors.state(entry_selector, column_name)
+        if state["quebrado"]:
+            self._log(f"  -> ⏭️ '{column_name}': seletor quebrado nesta execução. Procura pulada.")
+            return None
+        locator = state["alternativo"] or (By.CSS_SELECTOR, entry_selector)
+        started = time.perf_counter()
+        field = self._probe(driver, locator, SELECTOR_PROBE_TIMEOUT)
+        if field is not None:
+            self.selectors.found(entry_selector, 0.0)
+            return field
+
+        if self.selectors.claim_long_wait(entry_selector):
+            self._log(f"  -> ⏳ '{column_name}' não apareceu em {SELECTOR_PROBE_TIMEOUT:.0f} s. Aguardando até {PAGE_WAIT_TIMEOUT} s (só desta vez).")
+            field = self._probe(driver, locator, PAGE_WAIT_TIMEOUT - SELECTOR_PROBE_TIMEOUT)
+        alternate = None
+        if field is None:
+            for candidate in self._alternate_locators(entry_selector, column_name):
+                if candidate == locator:
+                    continue
+                field = self._probe(driver, candidate, SELECTOR_PROBE_TIMEOUT)
+                if field is not None:
+                    alternate = candidate
+                    self._log(f"  -> 🔀 '{column_name}' encontrado por um localizador alternativo, usado daqui em diante.")
+                    break
+
+        elapsed = time.perf_counter() - started
+        if field is not None:
+            self.selectors.found(entry_selector, elapsed, alternate)
+            return field
+        if self.selectors.missed(entry_selector, elapsed):
+            self._log(f"  -> 🚫 '{column_name}' não foi encontrado {SELECTOR_BROKEN_AFTER} vezes seguidas: seletor marcado como quebrado.")
+        return None
+
+    def _log_selector_summary(self):
+        summary = self.selectors.summary()
+        if not summary:
+            return
+        self.on_log("\n🐢 Seletores que custaram tempo nesta execução:")
+        for item in summary:
+            notes = [note for note, on in (("quebrado", item["quebrado"]), ("trocado pelo alternativo", item["alternativo"])) if on]
+            extra = f" ({', '.join(notes)})" if notes else ""
+            self.on_log(f"  '{item['coluna']}': {item['segundos_perdidos']:.1f} s perdidos{extra}")
+
+    def _try_fill_field(self, driver, wait: WebDriverWait, entry_selector: str, column_name: str, valor: str, resolved: tuple | None = None) -> bool:
+        """Preenche um campo pelo caminho interativo; `resolved` é o (elemento, tipo) de _resolve_fields, se houver."""
+        if self.stopped():
+            return False
+
+        valor = (valor or "").strip()
+        if not valor:
+            self._log(f"  -> ℹ️ Aviso: Valor vazio para '{column_name}'. Pulando.")
+            return True
+
+        try:
+            # 1) Elemento já localizado no carregamento da página; senão, procura individual
+            # (sonda curta, cache negativo e localizadores alternativos)
+            if resolved is not None:
+                field, kind = resolved
+            else:
+                field = self._find_field(driver, entry_selector, column_name)
+                if field is None:
+                    self._log(f"  -> ❌ ERRO FINAL (Preenchimento): Campo '{column_name}' não encontrado na página.")
+                    return False
+                kind = "texto" if field.tag_name.lower() in ["input", "textarea"] else "outro"
+
+            # 2) Campo texto/input
+            if kind in ("texto", "paragrafo"):
+                field.clear()
+                field.send_keys(valor)
+                self._log(f"  -> ✅ Preenchido '{column_name}' com sucesso.")
+                return True
+
+            # 3) Lista suspensa com índice de opções: um único clique pela posição
+            if kind == "lista" and self._select_indexed_option(driver, entry_selector, column_name, field, valor):
+                return True
+
+            # 3a) Dropdown/Opção (grupos de rádio/caixas vão direto para a opção visível)
+            if kind != "opcoes":
+                self._log(f"  -> 🖱️ Tentando selecionar opção '{valor}' para '{column_name}'...")
+                try:
+                    field.click()
+                    option_in_menu_xpath = f'//div[@role="option"]//span[normalize-space(text())="{valor}"]'
+                    option_element = wait.until(EC.element_to_be_clickable((By.XPATH, option_in_menu_xpath)))
+                    option_element.click()
+                    if self._wait_dropdown_settled(field, valor):
+                        self._log(f"  -> ✅ Selecionado via Dropdown.")
+                    else:
+                        self._log("  -> ⚠️ Opção clicada via Dropdown, mas a seleção não foi confirmada; o envio valida o campo.")
+                    return True
+                except Exception as e:
+                    # Loga o aviso intermediário (falha no dropdown, tenta opção visível)
+                    if self.stopped() and isinstance(e, WebDriverException):
+                        raise # Re-raise para ser pego pelo bloco exterior e tratado como parada
+                    self._log(f"    ⚠️ Aviso: Falha como dropdown. Tentando como opção visível. Detalhe: {e.__class__.__name__}")
+
+
+            # 3b) Rádio/Checkbox/Opção visível
+            option_xpath_visible = (
+                f'//div[contains(@role, "radio")]/div/div/div[3]/div | '
+                f'//label/div/div[2]/div[1]/span[normalize-space(text())="{valor}"] | '
+                f'//div[@role="listitem"]//span[normalize-space(text())="{valor}"]'
+            )
+            visible_option = wait.until(EC.element_to_be_clickable((By.XPATH, option_xpath_visible)))
+            visible_option.click()
+            self._wait_option_checked(visible_option)
+            self._log(f"  -> ✅ Selecionado como OPÇÃO visível.")
+            return True
+
+        except WebDriverException:
+            # Captura a exceção de "conexão recusada" quando o driver é fechado.
+            if self.stopped():
+                # Se a flag de parada estiver ativa, trata como parada suave
+                return False
+            # Caso contrário, é um erro de driver inesperado e crítico
+            self._log(f"  -> ❌ ERRO DE COMUNICAÇÃO (Preenchimento): Não foi possível preencher '{column_name}' com '{valor}'. Driver falhou.")
+            return False
+        except Exception as e:
+            # Captura outras exceções (como TimeoutException, etc.)
+            self._log(f"  -> ❌ ERRO FINAL (Preenchimento): Não foi possível preencher '{column_name}' com '{valor}'. Detalhe: {e.__class__.__name__}")
+            return False
+
+    def _start_driver(self):
+        """Pega um navegador aquecido (ou abre um Chrome) e o registra para que request_stop consiga fechá-lo."""
+        if self.stopped() or self._startup_aborted.is_set():
+            raise WebDriverException("execução cancelada antes de abrir o Chrome")
+        driver = self.browser_pool.acquire(self.headless) if self.browser_pool else None
+        if driver is not None:
+            self._log("♻️ Reaproveitando navegador já aberto.")
+        else:
+            driver = launch_chrome(self.headless)
+
+        with self._drivers_lock:
+            self.drivers.append(driver)
+        if self.stopped() or self._startup_aborted.is_set():
+            # A parada (ou falha na validação) chegou enquanto o Chrome abria
+            self._quit_driver(driver)
+            raise WebDriverException("parada solicitada durante a inicialização")
+        # A primeira carga vai sem bloqueio: serve de amostra do tamanho do que será evitado
+        set_blocked_urls(driver, [])
+        return driver
+
+    def _enable_resource_blocking(self, driver):
+        self.network.collect(driver)
+        if self.network.patterns and not set_blocked_urls(driver, self.network.patterns):
+            self._log("⚠️ Não foi possível ativar o bloqueio de recursos neste navegador.")
+
+    def _log_network_summary(self):
+        stats = self.network.summary()
+        if not stats["requisicoes_baixadas"] and not stats["requisicoes_bloqueadas"]:
+            return
+        self.on_log(
+            f"🌐 Rede: {stats['requisicoes_baixadas']} requisições baixadas "
+            f"({stats['bytes_baixados'] / 1_048_576:.1f} MB)."
+        )
+        if self.network.patterns:
+            self.on_log(
+                f"🚫 Bloqueio de recursos: {stats['requisicoes_bloqueadas']} requisições evitadas "
+                f"(≈ {stats['bytes_evitados_estimados'] / 1_048_576:.1f} MB economizados)."
+            )
+
+    def _quit_driver(self, driver):
+        with self._drivers_lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _release_driver(self, driver):
+        """Devolve o navegador ao gerenciador de aquecidos (ou o fecha, se não houver gerenciador)."""
+        if self.browser_pool is None:
+            self._quit_driver(driver)
+            return
+        with self._drivers_lock:
+            if driver not in self.drivers:
+                return  # request_stop já está fechando este navegador
+            self.drivers.remove(driver)
+        self.browser_pool.release(driver, self.headless)
+
+    def _row_value(self, row, column_name: str) -> str:
+        return row[self._value_index[column_name]]
+
+    def _resolve_fields(self, driver, mapping: dict) -> dict:
+        """Localiza os campos da página atual com um único execute_script: seletor -> (elemento, tipo).
+
+        Usa o localizador alternativo já descoberto e ignora os seletores
+        quebrados (SelectorHealth); os não encontrados ficam de fora.
+        """
+        campos = []
+        for selector, column in mapping.items():
+            state = self.selectors.state(selector, column)
+            if state["quebrado"]:
+                continue
+            by, value = state["alternativo"] or (By.CSS_SELECTOR, selector)
+            campos.append([selector, "xpath" if by == By.XPATH else "css", value])
+        if not campos:
+            return {}
+        try:
+            found = driver.execute_script(JS_RESOLVE_FIELDS, campos) or {}
+        except WebDriverException:
+            if self.stopped():
+                raise
+            return {}  # cada campo segue pela procura individual
+        for selector in found:
+            self.selectors.found(selector, 0.0)
+        return {selector: (element, kind) for selector, (element, kind) in found.items()}
+
+    def _bulk_fill(self, driver, row, mapping: dict, resolved: dict) -> dict:
+        """Preenche os campos de texto da linha com um único execute_script; retorna seletor -> status."""
+        campos = [
+            [selector, resolved.get(selector, (None, None))[0], self._row_value(row, column)]
+            for selector, column in mapping.items()
+        ]
+        try:
+            return driver.execute_script(JS_BULK_FILL, campos) or {}
+        except WebDriverException:
+            if self.stopped():
+                raise
+            # Sem o script, todos os campos seguem pelo preenchimento campo a campo
+            return {}
+
+    def _verify_prefill(self, driver, row) -> dict:
+        """Confere os campos vindos da URL pré-preenchida; retorna seletor -> coluna dos que divergem."""
+        campos = [
+            [self.form_fields[column]["entry"], selector, self._row_value(row, column)]
+            for selector, column in self.field_mapping.items()
+        ]
+        try:
+            divergentes = set(driver.execute_script(JS_VERIFY_PREFILL, campos) or [])
+        except WebDriverException:
+            if self.stopped():
+                raise
+            divergentes = set(self.field_mapping)
+        return {selector: column for selector, column in self.field_mapping.items() if selector in divergentes}
+
+    def _process_row(self, driver, wait: WebDriverWait, index: int, row, on_form: bool, has_next: bool):
+        """Preenche e envia uma linha no navegador informado.
+
+        Retorna (resultado, on_form): resultado True (sucesso), RowFailure (falha) ou
+        None (parada solicitada); on_form indica se a página atual já é o formulário limpo.
+        """
+        # Com o esquema do formulário, a linha já chega preenchida pela URL
+        prefilled = self.prefill and bool(self.form_fields)
+
+        # Garante estar no formulário limpo (ou pré-preenchido com a linha)
+        try:
+            if prefilled:
+                values = {f["entry"]: self._row_value(row, column) for column, f in self.form_fields.items()}
+                with self.timings.measure(index, "carregar_formulario"):
+                    driver.get(prefilled_form_url(self.form_url, values))
+                    wait.until(EC.presence_of_element_located((By.TAG_NAME, 'form')))
+            elif not on_form:
+                self._log("  -> Recarregando formulário...")
+                with self.timings.measure(index, "carregar_formulario"):
+                    driver.get(self.form_url)
+                    wait.until(EC.presence_of_element_located((By.TAG_NAME, 'form')))
+        except WebDriverException as e:
+            if self.stopped():
+                return None, False
+            self._log(f"⚠️ Falha ao carregar o formulário. Tentativa de recuperação: {e}")
+            return RowFailure(f"formulário não carregou ({e.__class__.__name__})", True), False
+
+        pending = self.field_mapping
+        if prefilled:
+            with self.timings.measure(index, "conferir_prefill"):
+                pending = self._verify_prefill(driver, row)
+            self._log(f"  -> 🔗 Pré-preenchido via URL ({len(self.field_mapping) - len(pending)}/{len(self.field_mapping)} campos conferidos).")
+            for column_name in pending.values():
+                self._log(f"  -> ⚠️ '{column_name}' não veio preenchido pela URL. Preenchendo na página.")
+
+        # Preenchimento de campos (elementos localizados uma vez por carregamento da página)
+        resolved = {}
+        if pending:
+            with self.timings.measure(index, "localizar_campos"):
+                resolved = self._resolve_fields(driver, pending)
+        # Valor fora das opções de uma lista: recusa já, sem esperar o tempo limite do clique
+        unknown = self._unknown_option(driver, row, pending, resolved)
+        if unknown is not None:
+            self._log(f"Registro {index + 1}: ❌ {unknown.reason}. Pulando.")
+            return unknown, False
+
+        fill_status = {}
+        if self.js_fill and pending:
+            with self.timings.measure(index, "preencher_lote_js"):
+                fill_status = self._bulk_fill(driver, row, pending, resolved)
+        for entry_selector, column_name in pending.items():
+            if self.stopped():
+                return None, True
+
+            valor = self._row_value(row, column_name)
+
+            status = fill_status.get(entry_selector)
+            if status == "ok":
+                self._log(f"  -> ✅ Preenchido '{column_name}' com sucesso.")
+                continue
+            if status == "vazio":
+                self._log(f"  -> ℹ️ Aviso: Valor vazio para '{column_name}'. Pulando.")
+                continue
+
+            # Listas/opções (ou campos que o script não encontrou) seguem pelo caminho interativo
+            with self.timings.measure(index, f"campo:{column_name}"):
+                filled = self._try_fill_field(driver, wait, entry_selector, column_name, valor, resolved.get(entry_selector))
+            if not filled:
+                # Se _try_fill_field retorna False, é falha ou parada (tratada dentro da função)
+                if self.stopped():
+                    return None, True
+                self._log(f"Registro {index + 1}: ❌ FALHA no preenchimento. Pulando.")
+                if self.selectors.state(entry_selector, column_name)["quebrado"]:
+                    # Layout mudou: outra tentativa da mesma linha também não acharia o campo
+                    return RowFailure(f"campo '{column_name}' não encontrado na página (seletor quebrado)", False), False
+                return RowFailure(f"'{column_name}' não foi preenchido", True), False
+
+        # Submissão (depois do clique, uma nova tentativa poderia duplicar a resposta)
+        submitted = confirmed = False
+        try:
+            self._log("  -> 📤 Tentando submeter...")
+            submit_button_xpath = '//div[@role="button"]//*[normalize-space(text())="Enviar"]'
+            with self.timings.measure(index, "clicar_enviar"):
+                submit_label = wait.until(EC.element_to_be_clickable((By.XPATH, submit_button_xpath)))
+                submit_label.find_element(By.XPATH, '..').click()
+            submitted = True
+
+            # Espera pela mensagem de sucesso
+            success_message_xpath = (
+                '//div[contains(text(), "Sua resposta foi registrada")] | '
+                '//div[contains(text(), "Sua resposta foi enviada")]'
+            )
+            with self.timings.measure(index, "aguardar_confirmacao"):
+                wait.until(EC.presence_of_element_located((By.XPATH, success_message_xpath)))
+            confirmed = True
+
+            self._log(f"Registro {index + 1}: ✅ SUCESSO! Submetido.")
+            # A próxima etapa já espera o link "Enviar outra resposta"; a pausa fixa de 0,6 s não é mais necessária
+            self._note_sleep_avoided(0.6)
+
+            # Prepara a próxima resposta (no modo pré-preenchido cada linha já abre a própria URL)
+            if not has_next:
+                self._log("  -> Fim da lista de registros.")
+                return True, False
+            if prefilled:
+                return True, False
+            self._log("  -> 🔄 Preparando próxima resposta...")
+            next_response_xpath = (
+                '//a[contains(text(), "Enviar outra resposta")] | '
+                '//div[@role="button"]//*[normalize-space(text())="Enviar outra resposta"]'
+            )
+            with self.timings.measure(index, "proxima_resposta"):
+                next_btn = WebDriverWait(driver, 8, poll_frequency=FAST_POLL_INTERVAL).until(
+                    EC.element_to_be_clickable((By.XPATH, next_response_xpath))
+                )
+                next_btn.click()
+            return True, True
+
+        except TimeoutException:
+            if self.stopped():
+                return None, False
+            if confirmed:
+                # Resposta registrada; só o link "Enviar outra resposta" não apareceu
+                return True, False
+            if submitted:
+                self._log(f"Registro {index + 1}: ❌ FALHA na submissão. Sem confirmação do formulário.")
+                return RowFailure("envio sem confirmação (a resposta pode ter sido registrada; conferir antes de reenviar)", False), False
+            self._log(f"Registro {index + 1}: ❌ FALHA na submissão. Botão 'Enviar' não ficou disponível.")
+            return RowFailure("botão 'Enviar' indisponível", True), False
+
+        except WebDriverException:
+            if self.stopped():
+                # Parada suave durante a submissão/espera de sucesso
+                return None, False
+            raise # É uma falha inesperada se não tiver sido parado
+
+        except Exception as e:
+            if self.stopped():
+                return None, False
+            self._log(f"Registro {index + 1}: ❌ FALHA na submissão. Erro: {e.__class__.__name__}")
+            return RowFailure(e.__class__.__name__, not submitted), False
+
+    def _feed_rows(self, sheet: SheetStream, rows: queue.Queue, abandon: threading.Event):
+        """Produtor: lê a planilha em streaming e alimenta a fila à medida que as linhas são lidas."""
+        try:
+            for index, row, raw in sheet.iter_rows(self._normalize):
+                key = self._row_key(raw)
+                if key is None or self._quarantined(index):
+                    continue
+                item = (index, row, key, 1)  # (índice, valores, chave do diário, tentativa)
+                while True:
+                    try:
+                        rows.put(item, timeout=0.2)
+                        break
+                    except queue.Full:
+                        if self.stopped() or abandon.is_set():
+                            return
+        except Exception as e:
+            self.on_log(f"🚨 ERRO ao ler a planilha: {e}")
+            with self._tally_lock:
+                self._sheet_error = True
+        finally:
+            self._feed_done.set()
+
+    def _next_row(self, rows: queue.Queue):
+        """Próxima linha: uma nova tentativa já vencida, senão a da planilha e, no fim, a passada final.
+
+        None quando não resta nada (nem linha em andamento em outra sessão que
+        possa voltar para nova tentativa) ou houve parada.
+        """
+        while not self.stopped():
+            if not self._running.wait(0.2):
+                continue  # pausado pelo disjuntor
+            sheet_done = self._feed_done.is_set() and rows.empty()
+            item = self.retries.pop(final_pass=sheet_done)
+            if item is None:
+                try:
+                    item = rows.get(timeout=0.2)
+                except queue.Empty:
+                    with self._tally_lock:
+                        if sheet_done and self._in_flight == 0 and not self.retries:
+                            return None
+                    continue
+            with self._tally_lock:
+                self._in_flight += 1
+            return item
+        return None
+
+    def _preload_form(self, driver, wait: WebDriverWait) -> bool:
+        """Abre o formulário logo após o Chrome subir, enquanto a planilha ainda é validada."""
+        try:
+            driver.get(self.form_url)
+            wait.until(EC.presence_of_element_located((By.TAG_NAME, 'form')))
+            return True
+        except Exception:
+            return False
+
+    def _wait_until_ready(self) -> bool:
+        """Aguarda a validação da planilha/formulário; False se a execução foi abortada ou parada."""
+        while not self._ready.wait(0.1):
+            if self.stopped() or self._startup_aborted.is_set():
+                return False
+        return not self.stopped()
+
+    def _session_loop(self, number: int, rows: queue.Queue):
+        """Uma sessão do pool: abre seu próprio Chrome e consome linhas da fila compartilhada."""
+        self._thread_local.prefix = f"[N{number}] " if self.pool_size > 1 else ""
+        try:
+            driver = self._start_driver()
+        except Exception as e:
+            if not self.stopped() and not self._startup_aborted.is_set():
+                self._log(f"🚨 ERRO ao iniciar o Chrome: {e}")
+            return
+
+        with self._tally_lock:
+            self._sessions_started += 1
+
+        wait = WebDriverWait(driver, PAGE_WAIT_TIMEOUT, poll_frequency=FAST_POLL_INTERVAL)
+        aborted = False
+        try:
+            on_form = self._preload_form(driver, wait)
+            self._enable_resource_blocking(driver)
+            if not self._wait_until_ready():
+                aborted = True
+                return
+
+            total = self._total
+            restarts = 0
+            while not self.stopped():
+                item = self._next_row(rows)
+                if item is None:
+                    break
+                index, row, key, attempt = item
+                crash = None
+                try:
+                    if attempt == 1:
+                        with self._tally_lock:
+                            self._rows_taken += 1
+                            taken = self._rows_taken
+                        self._log(f"\n📝 Processando registro {index + 1}/{total}...")
+                        self.on_progress(taken - 1, total)
+                        self.on_status(f"▶️ Processando registro {taken} de {total}")
+                    else:
+                        self._log(f"\n🔁 Registro {index + 1}: tentativa {attempt}...")
+
+                    has_next = not (self._feed_done.is_set() and rows.empty()) or bool(self.retries)
+                    with self.timings.measure(index, "linha_total"):
+                        result, on_form = self._process_row(driver, wait, index, row, on_form, has_next)
+                    self.network.collect(driver)
+                    if result is None:
+                        break
+                    if result is True:
+                        self._row_succeeded(item)
+                        restarts = 0  # o limite vale para quedas seguidas
+                    else:
+                        self._row_failed(item, result)
+                except Exception as e:
+                    # O navegador desta sessão caiu: a linha volta para nova tentativa
+                    if self.stopped():
+                        raise
+                    self._row_failed(item, RowFailure(f"navegador falhou ({e.__class__.__name__})", True))
+                    crash = e
+                finally:
+                    with self._tally_lock:
+                        self._in_flight -= 1
+
+                if crash is None:
+                    continue
+                # Reabre o Chrome e segue consumindo a fila (a sessão não pode simplesmente sair:
+                # com uma só sessão, ninguém mais enviaria a nova tentativa nem o resto da planilha)
+                restarts += 1
+                if restarts > SESSION_MAX_RESTARTS or self.stopped():
+                    raise crash
+                self._log(f"🔄 Navegador caiu ({crash.__class__.__name__}); reabrindo o Chrome ({restarts}/{SESSION_MAX_RESTARTS})...")
+                self._quit_driver(driver)
+                driver = self._start_driver()
+                wait = WebDriverWait(driver, PAGE_WAIT_TIMEOUT, poll_frequency=FAST_POLL_INTERVAL)
+                on_form = self._preload_form(driver, wait)
+                self._enable_resource_blocking(driver)
+
+        except Exception as e:
+            if not self.stopped():
+                self._log(f"🚨 ERRO CRÍTICO no navegador: {e}")
+                with self._tally_lock:
+                    self._fatal_error = self._fatal_error or e.__class__.__name__
+        finally:
+            if self.stopped():
+                self._quit_driver(driver)
+            elif aborted or not self.keep_open:
+                self._release_driver(driver)
+
+    def _count_result(self, success: bool):
+        with self._tally_lock:
+            if success:
+                self._successes += 1
+            else:
+                self._failures += 1
+            successes, failures = self._successes, self._failures
+        self.on_tally(successes, failures)
+
+    def _prepare_run(self):
+        """Lê o cabeçalho da planilha, o esquema do formulário e o diário de envios.
+
+        Roda enquanto os navegadores já estão abrindo. Retorna a planilha aberta ou
+        None (já chamando on_finished) se a execução não deve seguir; uma exceção
+        inesperada sobe com a planilha já fechada.
+        """
+        sheet = self._read_sheet()
+        if sheet is None:
+            return None
+
+        try:
+            # Associa as colunas às perguntas pelo título (antes do primeiro preenchimento)
+            fields = self._load_form_fields()
+            if fields is None:
+                sheet.close()
+                return None
+            if fields:
+                self.form_fields = fields
+                self.field_mapping = {schema_field_selector(f): column for column, f in fields.items()}
+            else:
+                self.on_log("  -> Usando os seletores CSS padrão.")
+                if self.prefill:
+                    self.on_log("  -> ℹ️ Sem o esquema do formulário, a URL pré-preenchida não é usada.")
+
+            self._open_journal()
+            self._preflight()
+        except BaseException:
+            sheet.close()
+            raise
+        return sheet
+
+    def run(self):
+        apply_ssl_fix()
+
+        if not self.form_url.startswith("http"):
+            self.on_finished(0, 0, "URL inválida")
+            return
+
+        try:
+            load_sheet_modules()
+            load_browser_modules()
+        except ImportError as e:
+            self.on_finished(0, 0, f"Dependência não instalada: {e.name or e}")
+            return
+
+        # Os navegadores abrem (e já carregam o formulário) em paralelo com a leitura da planilha
+        self.pool_size = max(1, self.pool_size or auto_pool_size())
+        self.on_status(f"🌐 Inicializando {self.pool_size} navegador(es)...")
+        self.on_log(f"🧵 Navegadores em paralelo: {self.pool_size}")
+
+        # Fila limitada: o produtor lê a planilha só à frente do consumo dos navegadores
+        rows = queue.Queue(maxsize=self.pool_size * 4)
+        sessions = [
+            threading.Thread(target=self._session_loop, args=(n + 1, rows), daemon=True)
+            for n in range(self.pool_size)
+        ]
+        for session in sessions:
+            session.start()
+
+        try:
+            sheet = self._prepare_run()
+        except Exception as e:
+            # Sem isso as sessões esperariam _ready para sempre, com o Chrome aberto
+            self.on_log(f"🚨 ERRO ao preparar a execução: {e}")
+            self._startup_aborted.set()
+            for session in sessions:
+                session.join()
+            self._close_journal()
+            self.on_finished(0, 0, "erro planilha")
+            return
+        if sheet is None:
+            self._startup_aborted.set()
+            for session in sessions:
+                session.join()
+            return
+
+        abandon = threading.Event()
+        feeder = threading.Thread(target=self._feed_rows, args=(sheet, rows, abandon), daemon=True)
+        try:
+            self._total = sheet.total
+            feeder.start()
+            self._ready.set()
+            for session in sessions:
+                session.join()
+            pending = not (self._feed_done.is_set() and rows.empty()) or bool(self.retries)
+            if pending and self._sessions_started and not self.stopped():
+                self._fail_unsent(rows)
+            abandon.set()
+            feeder.join()
+            self._abandon_retries()
+        finally:
+            sheet.close()
+            self._close_journal()
+
+        self._write_failed_rows()
+        self._log_wait_summary()
+        self._log_network_summary()
+        self._log_selector_summary()
+        self._write_timing_report()
+        if self.stopped():
+            reason = self._stop_reason()
+        elif self._sessions_started == 0:
+            reason = "erro chrome"
+        elif self._sheet_error:
+            reason = "erro leitura planilha"
+        elif pending and self._fatal_error:
+            reason = f"erro inesperado: {self._fatal_error}"
+        else:
+            reason = "concluído"
+        self.on_finished(self._successes, self._failures, reason)
+
+
+# ==========================
+# MOTOR HTTP (SEM NAVEGADOR)
+# ==========================
+
+# Mensagens que indicam que a resposta foi aceita pelo Forms
+FORM_SUCCESS_MARKERS = (
+    "Sua resposta foi registrada",
+    "Sua resposta foi enviada",
+    "Your response has been recorded",
+    "freebirdFormviewerViewResponseConfirmationMessage",
+)
+
+# Conexões mantidas abertas pela sessão HTTP (keep-alive)
+HTTP_POOL_SIZE = 8
+HTTP_TIMEOUT = 20
+
+
+def build_http_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """Cria uma sessão HTTP com pool de conexões reutilizáveis (sem verificação SSL, como no restante do app)."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.verify = False
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    })
+    return session
+
+
+def form_response_url(form_url: str) -> str:
+    """Converte a URL pública do formulário (.../viewform) no endpoint de envio (.../formResponse)."""
+    base = form_url.split("?", 1)[0].split("#", 1)[0].rstrip("/")
+    for suffix in ("/viewform", "/formResponse"):
+        if base.endswith(suffix):
+            base = base[: -len(suffix)]
+            break
+    return base + "/formResponse"
+
+
+class FormsHttpEngine(FormsEngine):
+    """Envia cada linha direto ao endpoint formResponse, sem abrir o Chrome.
+
+    Usa os mesmos ganchos do FormsEngine, então a MainWindow e a CLI trocam de
+    motor sem mudar as conexões. Só serve para formulários sem login/captcha.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # Mesma assinatura do FormsEngine; headless/keep_open/pool_size não se aplicam aqui
+        super().__init__(*args, **kwargs)
+        self.session = None
+
+    def request_stop(self):
+        self._stop_event.set()
+        self.on_log("🛑 Parada solicitada. Encerrando após a requisição atual...")
+
+    def _report_extra(self) -> dict:
+        return {}  # sem navegador, não há bloqueio de recursos a medir
+
+    def _http_rows(self, sheet: SheetStream):
+        """Linhas na ordem da planilha, intercalando as novas tentativas já vencidas; no fim, as agendadas e a passada final."""
+        for index, row, raw in sheet.iter_rows(self._normalize):
+            item = self.retries.pop()
+            while item is not None:
+                yield item
+                item = self.retries.pop()
+            key = self._row_key(raw)
+            if key is None or self._quarantined(index):
+                continue
+            yield (index, row, key, 1)
+        while not self.stopped():
+            item = self.retries.pop(final_pass=True)
+            if item is not None:
+                yield item
+                continue
+            wait = self.retries.wait_time()
+            if wait is None:
+                return
+            self._stop_event.wait(min(wait, 0.5))
+
+    def _is_success(self, response) -> bool:
+        return response.status_code == 200 and any(m in response.text for m in FORM_SUCCESS_MARKERS)
+
+    def run(self):
+        apply_ssl_fix()
+
+        if not self.form_url.startswith("http"):
+            self.on_finished(0, 0, "URL inválida")
+            return
+
+        try:
+            load_sheet_modules()
+        except ImportError as e:
+            self.on_finished(0, 0, f"Dependência não instalada: {e.name or e}")
+            return
+
+        sheet = self._read_sheet()
+        if sheet is None:
+            return
+
+        # Lê os metadados do formulário uma única vez (sem eles não há como saber os entry IDs)
+        self.session = build_http_session()
+        fields = self._load_form_fields(self.session)
+        if not fields:
+            self.session.close()
+            sheet.close()
+            if fields is not None:
+                self.on_finished(0, 0, "erro formulário")
+            return
+        self.form_fields = fields
+        entry_mapping = {f["entry"]: column for column, f in fields.items()}
+        post_url = form_response_url(self.form_url)
+        self._open_journal()
+        self._preflight()
+
+        self.on_log(f"⚡ Envio direto (HTTP) para {post_url}")
+
+        total = sheet.total
+        reason = "concluído"
+
+        try:
+            for item in self._http_rows(sheet):
+                if self.stopped():
+                    reason = self._stop_reason()
+                    break
+
+                index, row, key, attempt = item
+                if attempt == 1:
+                    self.on_log(f"\n📝 Processando registro {index + 1}/{total}...")
+                    self.on_progress(index, total)
+                    self.on_status(f"▶️ Processando registro {index + 1} de {total}")
+                else:
+                    self.on_log(f"\n🔁 Registro {index + 1}: tentativa {attempt}...")
+
+                payload = {"fvv": "1", "pageHistory": "0"}
+                for entry_id, column_name in entry_mapping.items():
+                    valor = self._row_value(row, column_name)
+                    if valor:
+                        payload[entry_id] = valor
+
+                try:
+                    with self.timings.measure(index, "envio_http"):
+                        response = self.session.post(post_url, data=payload, timeout=HTTP_TIMEOUT)
+                except requests.exceptions.ConnectionError as e:
+                    self.on_log(f"Registro {index + 1}: ❌ FALHA de rede. Erro: {e.__class__.__name__}")
+                    self._row_failed(item, RowFailure(f"falha de rede ({e.__class__.__name__})", True))
+                    continue
+                except requests.exceptions.RequestException as e:
+                    # A requisição pode ter chegado ao Forms: reenviar poderia duplicar a resposta
+                    self.on_log(f"Registro {index + 1}: ❌ FALHA de rede. Erro: {e.__class__.__name__}")
+                    self._row_failed(item, RowFailure(
+                        f"sem resposta do formulário ({e.__class__.__name__}; conferir antes de reenviar)", False))
+                    continue
+
+                if self._is_success(response):
+                    self.on_log(f"Registro {index + 1}: ✅ SUCESSO! Submetido.")
+                    self._row_succeeded(item)
+                else:
+                    self.on_log(f"Registro {index + 1}: ❌ FALHA na submissão. HTTP {response.status_code}")
+                    self._row_failed(item, RowFailure(f"HTTP {response.status_code}", response.status_code in TRANSIENT_HTTP_STATUS))
+
+            if self.stopped():
+                reason = self._stop_reason()  # o disjuntor pode ter abortado na última linha
+            self._abandon_retries()
+        except Exception as e:
+            self.on_log(f"🚨 ERRO CRÍTICO no loop principal: {e}")
+            reason = f"erro inesperado: {e.__class__.__name__}"
+
+        finally:
+            sheet.close()
+            self._close_journal()
+            self.session.close()
+            self.session = None
+
+        self._write_failed_rows()
+        self._write_timing_report()
+        self.on_finished(self._successes, self._failures, reason)
+
+
+# ==========================
+# LINHA DE COMANDO
+# ==========================
+
+EXIT_OK = 0
+EXIT_FAILURES = 1      # a execução terminou, mas alguma linha falhou
+EXIT_ERROR = 2         # a execução não pôde rodar (URL, planilha, colunas, formulário, Chrome)
+EXIT_INTERRUPTED = 130
+
+
+def load_field_mapping(path: str) -> dict:
+    """Lê o mapeamento {seletor ou entry.<id>: coluna} de um arquivo JSON."""
+    with open(path, "r", encoding="utf-8") as f:
+        mapping = json.load(f)
+    if not isinstance(mapping, dict) or not all(isinstance(v, str) for v in mapping.values()):
+        raise ValueError("o mapeamento deve ser um objeto JSON {seletor: coluna}")
+    return mapping
+
+
+def exit_code_for(successes: int, failures: int, reason: str) -> int:
+    if reason == "parado pelo usuário":
+        return EXIT_INTERRUPTED
+    if reason != "concluído":
+        return EXIT_ERROR
+    return EXIT_FAILURES if failures else EXIT_OK
+
+
+def attach_console_output(engine: FormsEngine, as_json: bool):
+    """Liga os ganchos do motor ao stdout: texto legível ou uma linha JSON por evento."""
+    def emit(event: str, **data):
+        print(json.dumps({"evento": event, "hora": time.strftime("%H:%M:%S"), **data}, ensure_ascii=False), flush=True)
+
+    if as_json:
+        engine.on_log = lambda text: emit("log", mensagem=text)
+        engine.on_progress = lambda current, total: emit("progresso", atual=current, total=total)
+        engine.on_status = lambda text: emit("status", mensagem=text)
+        engine.on_tally = lambda successes, failures: emit("parcial", sucessos=successes, falhas=failures)
+        engine.on_circuit = lambda state, detail: emit("disjuntor", estado=state, detalhe=detail)
+        engine.on_finished = lambda successes, failures, reason: emit(
+            "fim", sucessos=successes, falhas=failures, motivo=reason)
+    else:
+        engine.on_log = lambda text: print(text, flush=True)
+        engine.on_finished = lambda successes, failures, reason: print(
+            f"\n🏁 Fim: {successes} sucesso(s), {failures} falha(s) — {reason}", flush=True)
+
+
+def main(argv=None) -> int:
+    # Consoles Windows (cp1252) não codificam emoji: força UTF-8 em vez de quebrar no primeiro print.
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8", errors="replace")
+    parser = argparse.ArgumentParser(description="Envia as linhas de uma planilha a um Google Forms, sem interface gráfica.")
+    parser.add_argument("--url", required=True, help="URL pública do formulário (.../viewform).")
+    parser.add_argument("--planilha", required=True, help="Planilha .xlsx (primeira aba, cabeçalho na linha 1).")
+    parser.add_argument("--mapeamento", help="JSON {seletor ou entry.<id>: coluna}; padrão: FIELD_MAPPING_DEFAULT.")
+    parser.add_argument("--headless", action="store_true", help="Abre o Chrome sem janela.")
+    parser.add_argument("--concorrencia", type=int, default=1, help="Navegadores em paralelo (0 = automático).")
+    parser.add_argument("--http", action="store_true", help="Envio direto (HTTP), sem navegador.")
+    parser.add_argument("--sem-retomar", action="store_true", help="Reenvia linhas já confirmadas no diário.")
+    parser.add_argument("--sem-js", action="store_true", help="Preenche campo a campo, sem o lote em JavaScript.")
+    parser.add_argument("--sem-prefill", action="store_true", help="Não usa a URL pré-preenchida.")
+    parser.add_argument("--sem-bloqueio", action="store_true", help="Não bloqueia imagens, fontes e analytics no Chrome.")
+    parser.add_argument("--permitir", action="append", default=[], metavar="PADRAO",
+                        help="Libera um padrão da lista de bloqueio (pode repetir; ex.: fonts.gstatic.com).")
+    parser.add_argument("--formato-data", default=DATE_FORMAT, metavar="FORMATO",
+                        help=f"Formato (strftime) das datas enviadas como texto; padrão: {DATE_FORMAT.replace('%', '%%')}.")
+    parser.add_argument("--separador-decimal", default=DECIMAL_SEPARATOR, metavar="SEP",
+                        help="Separador decimal dos números não inteiros (ex.: ',').")
+    parser.add_argument("--limite-falhas", type=int, default=BREAKER_CONSECUTIVE_FAILURES, metavar="N",
+                        help="Falhas seguidas que disparam o disjuntor (0 = desliga).")
+    parser.add_argument("--taxa-falhas", type=float, default=BREAKER_FAILURE_RATE, metavar="TAXA",
+                        help=f"Taxa de falhas (0 a 1) nas últimas {BREAKER_WINDOW} tentativas que dispara o disjuntor (0 = desliga).")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON lines (um evento por linha).")
+    args = parser.parse_args(argv)
+
+    try:
+        field_mapping = load_field_mapping(args.mapeamento) if args.mapeamento else dict(FIELD_MAPPING_DEFAULT)
+    except (OSError, ValueError) as e:
+        print(f"🚨 Mapeamento inválido: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    engine_cls = FormsHttpEngine if args.http else FormsEngine
+    engine = engine_cls(
+        form_url=args.url,
+        excel_path=args.planilha,
+        field_mapping=field_mapping,
+        headless=args.headless,
+        keep_open=False,
+        pool_size=max(0, args.concorrencia),
+        resume=not args.sem_retomar,
+        js_fill=not args.sem_js,
+        prefill=not args.sem_prefill,
+        block_resources=not args.sem_bloqueio,
+        resource_allowlist=args.permitir,
+        value_formats=ValueFormats(date_format=args.formato_data, decimal_separator=args.separador_decimal),
+        breaker=CircuitBreaker(consecutive=max(0, args.limite_falhas), failure_rate=max(0.0, args.taxa_falhas)),
+        # Sem janela, ninguém clicaria em Retomar: só a pausa por falta de rede (que se retoma sozinha) é usada
+        pause_on_trip=False,
+    )
+    attach_console_output(engine, args.json)
+    result = {}
+    on_finished = engine.on_finished
+
+    def finished(successes, failures, reason):
+        result.update(successes=successes, failures=failures, reason=reason)
+        on_finished(successes, failures, reason)
+
+    engine.on_finished = finished
+
+    # O motor roda em outra thread para o Ctrl+C chegar aqui e virar uma parada limpa
+    runner = threading.Thread(target=engine.run, daemon=True)
+    runner.start()
+    try:
+        while runner.is_alive():
+            runner.join(0.5)
+    except KeyboardInterrupt:
+        engine.request_stop()
+        runner.join()
+
+    if not result:
+        return EXIT_ERROR
+    return exit_code_for(result["successes"], result["failures"], result["reason"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
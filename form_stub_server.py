@@ -0,0 +1,167 @@
+"""Servidor local que imita um Google Forms, para testar o envio direto (HTTP) sem internet.
+
+Uso:
+    python form_stub_server.py                 # porta 8765, perguntas padrão
+    python form_stub_server.py --porta 9000 --schema perguntas.json
+
+Depois, use no app a URL exibida no terminal (http://127.0.0.1:<porta>/forms/d/e/teste/viewform).
+As respostas recebidas são exibidas no terminal e ficam disponíveis em /respostas (JSON).
+
+Formato do --schema (lista JSON):
+    [{"titulo": "UNIDADE", "tipo": "lista", "opcoes": ["A", "B"], "obrigatoria": true}, ...]
+Tipos aceitos: texto, paragrafo, multipla, lista.
+"""
+import argparse
+import html
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Códigos de tipo usados pelo Google Forms no FB_PUBLIC_LOAD_DATA_
+TIPOS = {"texto": 0, "paragrafo": 1, "multipla": 2, "lista": 3}
+
+# Perguntas padrão (mesmas colunas de FIELD_MAPPING_DEFAULT, na mesma ordem)
+PERGUNTAS_PADRAO = [
+    {"titulo": "TECNOLOGIA", "tipo": "lista", "opcoes": ["SOLINFTEC", "JOHN DEERE", "CASE"], "obrigatoria": True},
+    {"titulo": "UNIDADE", "tipo": "lista", "opcoes": ["UNIDADE 1", "UNIDADE 2", "UNIDADE 3"], "obrigatoria": True},
+    {"titulo": "SETOR", "tipo": "lista", "opcoes": ["CCT", "AGRÍCOLA", "INDUSTRIAL"], "obrigatoria": True},
+    {"titulo": "FRENTE", "tipo": "lista", "opcoes": ["FRENTE 1", "FRENTE 2", "FRENTE 3"], "obrigatoria": True},
+    {"titulo": "MODELO", "tipo": "lista", "opcoes": ["COLHEDORA", "TRATOR", "CAMINHÃO"], "obrigatoria": True},
+    {"titulo": "FROTA", "tipo": "texto", "obrigatoria": True},
+    {"titulo": "QRM", "tipo": "paragrafo", "obrigatoria": False},
+    {"titulo": "LOCAL (QTH)", "tipo": "paragrafo", "obrigatoria": False},
+    {"titulo": "RESPONSÁVEL PELA O.S", "tipo": "paragrafo", "obrigatoria": False},
+]
+
+FBZX = "-1234567890123456789"
+
+
+class FormularioFake:
+    """Guarda as perguntas do formulário falso e as respostas recebidas."""
+
+    def __init__(self, perguntas: list):
+        self.perguntas = []
+        for i, p in enumerate(perguntas):
+            self.perguntas.append({
+                "item_id": 100000 + i,
+                "entry_id": 200000 + i,
+                "titulo": p["titulo"],
+                "tipo": TIPOS[p.get("tipo", "texto")],
+                "opcoes": list(p.get("opcoes", [])),
+                "obrigatoria": bool(p.get("obrigatoria", False)),
+            })
+        self.respostas = []
+        self.lock = threading.Lock()
+
+    def load_data(self) -> list:
+        """Monta a estrutura FB_PUBLIC_LOAD_DATA_ no mesmo formato do Google Forms."""
+        itens = []
+        for p in self.perguntas:
+            opcoes = [[o, None, None, None, 0] for o in p["opcoes"]] or None
+            campo = [p["entry_id"], opcoes, 1 if p["obrigatoria"] else 0]
+            itens.append([p["item_id"], p["titulo"], None, p["tipo"], [campo]])
+        return [None, ["", itens, None, None, None, None, None, None, "Formulário de teste"], "/forms", "Formulário de teste"]
+
+    def pagina(self) -> str:
+        campos = []
+        for p in self.perguntas:
+            nome = f"entry.{p['entry_id']}"
+            if p["opcoes"]:
+                opts = "".join(f"<option>{html.escape(o)}</option>" for o in p["opcoes"])
+                campo = f'<select name="{nome}"><option></option>{opts}</select>'
+            elif p["tipo"] == TIPOS["paragrafo"]:
+                campo = f'<textarea name="{nome}"></textarea>'
+            else:
+                campo = f'<input type="text" name="{nome}">'
+            campos.append(f"<div role=\"listitem\"><label>{html.escape(p['titulo'])}</label>{campo}</div>")
+        return (
+            "<html><head><meta charset=\"utf-8\"><title>Formulário de teste</title></head><body>"
+            "<form action=\"formResponse\" method=\"POST\">"
+            + "".join(campos)
+            + f'<input type="hidden" name="fbzx" value="{FBZX}">'
+            "<button type=\"submit\">Enviar</button></form>"
+            f"<script>var FB_PUBLIC_LOAD_DATA_ = {json.dumps(self.load_data())};</script>"
+            "</body></html>"
+        )
+
+    def validar(self, dados: dict) -> list:
+        """Retorna a lista de erros da resposta (vazia se válida), como o Forms faria."""
+        erros = []
+        for p in self.perguntas:
+            valor = dados.get(f"entry.{p['entry_id']}", "")
+            if p["obrigatoria"] and not valor:
+                erros.append(f"'{p['titulo']}' é obrigatória")
+            elif valor and p["opcoes"] and valor not in p["opcoes"]:
+                erros.append(f"'{valor}' não é uma opção válida de '{p['titulo']}'")
+        return erros
+
+
+def criar_handler(formulario: FormularioFake):
+    class Handler(BaseHTTPRequestHandler):
+        def _responder(self, codigo: int, corpo: str, tipo: str = "text/html; charset=utf-8"):
+            dados = corpo.encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            caminho = urlparse(self.path).path
+            if caminho.endswith("/viewform"):
+                self._responder(200, formulario.pagina())
+            elif caminho == "/respostas":
+                with formulario.lock:
+                    corpo = json.dumps(formulario.respostas, ensure_ascii=False)
+                self._responder(200, corpo, "application/json; charset=utf-8")
+            else:
+                self._responder(404, "não encontrado")
+
+        def do_POST(self):
+            if not urlparse(self.path).path.endswith("/formResponse"):
+                self._responder(404, "não encontrado")
+                return
+            tamanho = int(self.headers.get("Content-Length", 0))
+            corpo = self.rfile.read(tamanho).decode("utf-8")
+            dados = {k: v[0] for k, v in parse_qs(corpo, keep_blank_values=True).items()}
+            erros = formulario.validar(dados)
+            if erros:
+                print(f"❌ Resposta rejeitada: {'; '.join(erros)}")
+                self._responder(400, formulario.pagina())
+                return
+            with formulario.lock:
+                formulario.respostas.append(dados)
+                total = len(formulario.respostas)
+            print(f"✅ Resposta {total} recebida: {json.dumps(dados, ensure_ascii=False)}")
+            self._responder(200, "<html><body><div>Sua resposta foi registrada.</div>"
+                                 "<a href=\"viewform\">Enviar outra resposta</a></body></html>")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita um Google Forms.")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--schema", help="Arquivo JSON com as perguntas do formulário.")
+    args = parser.parse_args()
+
+    perguntas = PERGUNTAS_PADRAO
+    if args.schema:
+        with open(args.schema, "r", encoding="utf-8") as f:
+            perguntas = json.load(f)
+
+    formulario = FormularioFake(perguntas)
+    servidor = ThreadingHTTPServer(("127.0.0.1", args.porta), criar_handler(formulario))
+    print(f"🧪 Formulário de teste em http://127.0.0.1:{args.porta}/forms/d/e/teste/viewform")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Servidor encerrado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Gera o manifest.json usado pelos atualizadores (versão + SHA-256 de cada arquivo distribuído).
+
+Uso:
+    python gerar_manifest.py
+
+Rode sempre que alterar version.txt ou algum arquivo de MANIFEST_FILES, no mesmo commit (o workflow
+auto-manifest.yml faz isso automaticamente a cada push na main).
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(APP_DIR, "manifest.json")
+# Arquivos baixados pelos atualizadores, relativos à raiz do repositório
+MANIFEST_FILES = ["main.py", "form_engine.py", "updater_core.py"]
+# Constantes de versão que precisam bater com version.txt (o main.py recusa um motor de outra versão)
+VERSION_CONSTANTS = {"main.py": "VERSAO", "form_engine.py": "ENGINE_VERSION"}
+
+
+def sha256_do_arquivo(caminho: str) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(64 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def versoes_divergentes(versao: str) -> list:
+    """Arquivos cuja constante de versão difere de version.txt."""
+    divergentes = []
+    for nome, constante in VERSION_CONSTANTS.items():
+        with open(os.path.join(APP_DIR, nome), "r", encoding="utf-8") as f:
+            encontrada = re.search(rf'^{constante} = "([^"]*)"', f.read(), re.MULTILINE)
+        if not encontrada or encontrada.group(1) != versao:
+            divergentes.append(f"{nome}: {constante} = {encontrada.group(1) if encontrada else '?'}")
+    return divergentes
+
+
+def main():
+    with open(os.path.join(APP_DIR, "version.txt"), "r", encoding="utf-8") as f:
+        versao = f.read().strip()
+
+    divergentes = versoes_divergentes(versao)
+    if divergentes:
+        print(f"❌ Versões diferentes de version.txt ({versao}): {'; '.join(divergentes)}")
+        sys.exit(1)
+
+    arquivos = {}
+    for nome in MANIFEST_FILES:
+        caminho = os.path.join(APP_DIR, nome)
+        arquivos[nome] = {"sha256": sha256_do_arquivo(caminho), "size": os.path.getsize(caminho)}
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8", newline="\n") as f:
+        json.dump({"version": versao, "files": arquivos}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"✅ manifest.json gerado para a versão {versao} ({len(arquivos)} arquivo(s)).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,22 @@
-import os
 import sys
 import time
-import ssl
-import certifi
+
+# Marco zero do perfil de inicialização (--profile-startup)
+_STARTUP_T0 = time.perf_counter()
+
+import json
 import threading
-import requests
+import logging
+import logging.handlers
 import subprocess
-import urllib3
 from pathlib import Path
+from collections import deque
 
-import pandas as pd
-
-# Selenium / Undetected ChromeDriver
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-from selenium.common.exceptions import (
-    TimeoutException,
-    NoSuchElementException,
-    ElementClickInterceptedException,
-    WebDriverException,
-)
-
-from selenium.webdriver.chrome.options import Options
+# pandas, openpyxl, selenium e undetected_chromedriver são carregados sob demanda
+# pelo form_engine.py, para a janela abrir sem esperar por eles.
 
 # PySide6 / Qt
-from PySide6.QtCore import QThread, Signal, Qt, QSize
+from PySide6.QtCore import QThread, Signal, Qt, QSize, QTimer
 from PySide6.QtGui import QFont, QAction, QTextOption, QPalette, QColor, QIcon
 from PySide6.QtWidgets import (
     QApplication,
@@ -37,6 +26,7 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QPushButton,
     QCheckBox,
+    QSpinBox,
     QFileDialog,
     QProgressBar,
     QPlainTextEdit,
@@ -51,22 +41,55 @@ from PySide6.QtWidgets import (
 
 
 # ==========================
-# CONFIGURAÇÕES INICIAIS
+# MOTOR DA AUTOMAÇÃO (form_engine.py, SEM QT)
 # ==========================
 
-# Corrige SSL e suprime avisos
-def apply_ssl_fix():
-    """Garante que o ambiente Python reconheça certificados SSL e suprime avisos de requisição insegura."""
-    try:
-        os.environ["SSL_CERT_FILE"] = certifi.where()
-        ssl._create_default_https_context = ssl._create_unverified_context
-        # Suprime o aviso de InsecureRequestWarning
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    except Exception:
-        pass
-
+REPO_RAW_URL = "https://raw.githubusercontent.com/Kvsl11/Auto_form/main/"
 VERSAO = "1.0.3"
 
+
+def _require_engine():
+    """Confere o form_engine.py entregue pelo atualizador (sem rede); ausente ou de outra versão, avisa e encerra.
+
+    Quem baixa o motor são os atualizadores (apply_manifest_update); o main.py
+    só recusa abrir com um motor que não corresponde a esta versão.
+    """
+    try:
+        import form_engine
+    except Exception as e:
+        problema = f"O arquivo form_engine.py não foi encontrado ou não pôde ser carregado ({e.__class__.__name__}: {e})."
+    else:
+        versao_motor = getattr(form_engine, "ENGINE_VERSION", "")
+        if versao_motor == VERSAO:
+            return
+        problema = f"O form_engine.py instalado (versão {versao_motor or 'anterior à 1.0.3'}) não corresponde a esta versão do app (v{VERSAO})."
+    app = QApplication.instance() or QApplication(sys.argv)  # a caixa de diálogo precisa de uma QApplication viva
+    QMessageBox.critical(
+        app.activeWindow(),
+        "Auto - Form: instalação incompleta",
+        f"{problema}\n\nExecute o atualizador (iniciar_app.bat) para baixar os arquivos do app e abra-o novamente.",
+    )
+    sys.exit(1)
+
+
+_require_engine()
+
+from form_engine import (
+    APP_DIR,
+    REPORTS_DIR,
+    LAZY_IMPORT_TIMES,
+    FIELD_MAPPING_DEFAULT,
+    MAX_BROWSER_SESSIONS,
+    BrowserSessionManager,
+    FormsEngine,
+    FormsHttpEngine,
+    apply_ssl_fix,
+    auto_pool_size,
+    load_sheet_modules,
+    load_browser_modules,
+    preload_heavy_modules,
+)
+
 # URL padrão
 DEFAULT_FORM_URL = "https://docs.google.com/forms/d/e/1FAIpQLSfLyptmo3NFUx8dxC7k0obmQxAXPuimBLC_L30xgZOsygvqpg/viewform"
 
@@ -74,294 +97,75 @@ DEFAULT_FORM_URL = "https://docs.google.com/forms/d/e/1FAIpQLSfLyptmo3NFUx8dxC7k
 DEFAULT_EXCEL_PATH = str(Path.home() / "Downloads" / "Auto_teste.xlsx")
 
 
-# Mapeamento de campos
-FIELD_MAPPING_DEFAULT = {
-    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(1) > div > div > div.vQES8d > div > div:nth-child(1) > div.ry3kXd > div.MocG8c.HZ3kWc.mhLiyf.LMgvRb.DEh1R.KKjvXb': "TECNOLOGIA",
-    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(2) > div > div > div.vQES8d > div > div:nth-child(1) > div.ry3kXd > div.MocG8c.HZ3kWc.mhLiyf.LMgvRb.KKjvXb.DEh1R': "UNIDADE",
-    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(3) > div > div > div.vQES8d > div > div:nth-child(1) > div.ry3kXd > div.MocG8c.HZ3kWc.mhLiyf.LMgvRb.KKjvXb.DEh1R': "SETOR",
-    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(4) > div > div > div.vQES8d > div > div:nth-child(1) > div.ry3kXd > div.MocG8c.HZ3kWc.mhLiyf.LMgvRb.KKjvXb.DEh1R': "FRENTE",
-    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(5) > div > div > div.vQES8d > div > div:nth-child(1) > div.ry3kXd > div.MocG8c.HZ3kWc.mhLiyf.LMgvRb.KKjvXb.DEh1R': "MODELO",
-    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(6) > div > div > div.AgroKb > div > div.aCsJod.oJeWuf > div > div.Xb9hP > input': "FROTA",
-    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(7) > div > div > div.AgroKb > div > div.RpC4Ne.oJeWuf > div.Pc9Gce.Wic03c > textarea': "QRM",
-    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(8) > div > div > div.AgroKb > div > div.RpC4Ne.oJeWuf > div.Pc9Gce.Wic03c > textarea': "LOCAL (QTH)",
-    '#mG61Hd > div.RH5hzf.RLS9Fe > div > div.o3Dpx > div:nth-child(9) > div > div > div.AgroKb > div > div.RpC4Ne.oJeWuf > div.Pc9Gce.Wic03c > textarea': "RESPONSÁVEL PELA O.S",
-}
-
-
 # ==========================
 # WORKER (THREAD) DA AUTOMAÇÃO
 # ==========================
 
 class FormsWorker(QThread):
+    """Roda o FormsEngine em uma QThread, repassando os ganchos do motor como sinais para a janela."""
     log = Signal(str)                 # mensagens de log
     progress = Signal(int, int)       # atual, total
     status = Signal(str)              # texto de status
+    tally = Signal(int, int)          # sucessos, falhas (parcial, somando todos os navegadores)
+    circuit = Signal(str, str)        # estado do disjuntor (aberto, pausado, fechado), detalhe
     finished = Signal(int, int, str)  # sucessos, falhas, motivo
 
-    def __init__(self, form_url: str, excel_path: str, field_mapping: dict, headless: bool, keep_open: bool):
+    engine_class = FormsEngine
+
+    def __init__(self, *args, **kwargs):
+        # Mesma assinatura do motor (form_url, excel_path, field_mapping, headless, keep_open, ...)
         super().__init__()
-        self.form_url = form_url.strip()
-        self.excel_path = excel_path.strip()
-        self.field_mapping = field_mapping or {}
-        self.headless = headless
-        self.keep_open = keep_open
-        self._stop_event = threading.Event()
-        self.driver = None
+        self.engine = self.engine_class(*args, **kwargs)
+        self.engine.on_log = self.log.emit
+        self.engine.on_progress = self.progress.emit
+        self.engine.on_status = self.status.emit
+        self.engine.on_tally = self.tally.emit
+        self.engine.on_circuit = self.circuit.emit
+        self.engine.on_finished = self.finished.emit
 
     def request_stop(self):
-        # Sinaliza a parada e tenta forçar o fechamento do driver imediatamente
-        self._stop_event.set()
-        self.log.emit("🛑 Parada solicitada. Tentando fechar o navegador...")
-        try:
-            if self.driver:
-                # O quit() é crucial para interromper chamadas bloqueantes do Selenium (wait.until, driver.get)
-                self.driver.quit()
-        except Exception:
-            pass
-        finally:
-            self.driver = None
-
-    def stopped(self) -> bool:
-        return self._stop_event.is_set()
-
-    def _try_fill_field(self, wait: WebDriverWait, entry_selector: str, column_name: str, valor: str) -> bool:
-        if self.stopped():
-            return False
-
-        valor = (valor or "").strip()
-        if not valor:
-            self.log.emit(f"  -> ℹ️ Aviso: Valor vazio para '{column_name}'. Pulando.")
-            return True
-
-        try:
-            # 1) Tenta localizar pelo CSS
-            field = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, entry_selector)))
-
-            # 2) Campo texto/input
-            tag = field.tag_name.lower()
-            if tag in ["input", "textarea"]:
-                field.clear()
-                field.send_keys(valor)
-                self.log.emit(f"  -> ✅ Preenchido '{column_name}' com sucesso.")
-                return True
-
-            # 3) Dropdown/Opção
-            self.log.emit(f"  -> 🖱️ Tentando selecionar opção '{valor}' para '{column_name}'...")
-            try:
-                field.click()
-                option_in_menu_xpath = f'//div[@role="option"]//span[normalize-space(text())="{valor}"]'
-                option_element = wait.until(EC.element_to_be_clickable((By.XPATH, option_in_menu_xpath)))
-                option_element.click()
-                time.sleep(0.3)
-                self.log.emit(f"  -> ✅ Selecionado via Dropdown.")
-                return True
-            except Exception as e:
-                # Loga o aviso intermediário (falha no dropdown, tenta opção visível)
-                if self.stopped() and isinstance(e, WebDriverException):
-                    raise # Re-raise para ser pego pelo bloco exterior e tratado como parada
-                self.log.emit(f"    ⚠️ Aviso: Falha como dropdown. Tentando como opção visível. Detalhe: {e.__class__.__name__}")
-
-
-            # 3b) Rádio/Checkbox/Opção visível
-            option_xpath_visible = (
-                f'//div[contains(@role, "radio")]/div/div/div[3]/div | '
-                f'//label/div/div[2]/div[1]/span[normalize-space(text())="{valor}"] | '
-                f'//div[@role="listitem"]//span[normalize-space(text())="{valor}"]'
-            )
-            visible_option = wait.until(EC.element_to_be_clickable((By.XPATH, option_xpath_visible)))
-            visible_option.click()
-            time.sleep(0.3)
-            self.log.emit(f"  -> ✅ Selecionado como OPÇÃO visível.")
-            return True
-
-        except WebDriverException:
-            # Captura a exceção de "conexão recusada" quando o driver é fechado.
-            if self.stopped():
-                # Se a flag de parada estiver ativa, trata como parada suave
-                return False
-            # Caso contrário, é um erro de driver inesperado e crítico
-            self.log.emit(f"  -> ❌ ERRO DE COMUNICAÇÃO (Preenchimento): Não foi possível preencher '{column_name}' com '{valor}'. Driver falhou.")
-            return False
-        except Exception as e:
-            # Captura outras exceções (como TimeoutException, etc.)
-            self.log.emit(f"  -> ❌ ERRO FINAL (Preenchimento): Não foi possível preencher '{column_name}' com '{valor}'. Detalhe: {e.__class__.__name__}")
-            return False
+        self.engine.request_stop()
 
+    def resume(self):
+        self.engine.continue_run()
 
     def run(self):
-        apply_ssl_fix()
+        self.engine.run()
 
-        if not self.form_url.startswith("http"):
-            self.finished.emit(0, 0, "URL inválida")
-            return
 
-        # Leitura da planilha
-        try:
-            self.status.emit("📚 Lendo arquivo Excel...")
-            df = pd.read_excel(self.excel_path)
-            df.columns = df.columns.str.replace('\n', ' ', regex=False).str.strip()
-            cols_mapped = set(self.field_mapping.values())
-            missing = [c for c in cols_mapped if c not in df.columns]
-            if missing:
-                self.log.emit(f"🚨 ERRO CRÍTICO: Colunas mapeadas não encontradas: {', '.join(missing)}")
-                self.finished.emit(0, 0, "colunas ausentes")
-                return
-            total = len(df)
-            self.log.emit(f"📊 Planilha lida com sucesso. Total de {total} registros.")
-        except FileNotFoundError:
-            self.finished.emit(0, 0, "arquivo não encontrado")
-            return
-        except Exception as e:
-            self.log.emit(f"🚨 ERRO ao ler a planilha: {e}")
-            self.finished.emit(0, 0, "erro leitura planilha")
-            return
+class FormsHttpWorker(FormsWorker):
+    """Mesma ponte Qt, com o motor de envio direto (HTTP)."""
+    engine_class = FormsHttpEngine
 
-        # Configura o Chrome
-        self.status.emit("🌐 Inicializando navegador...")
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument('--ignore-certificate-errors')
-            if self.headless:
-                chrome_options.add_argument('--headless=new')
-                chrome_options.add_argument('--window-size=1920,1080')
-                chrome_options.add_argument('--no-sandbox')
-                chrome_options.add_argument('--disable-dev-shm-usage')
-
-            self.driver = uc.Chrome(options=chrome_options)
-            try:
-                self.driver.maximize_window()
-            except Exception:
-                pass
-
-            wait = WebDriverWait(self.driver, 15)
-        except Exception as e:
-            self.log.emit(f"🚨 ERRO ao iniciar o Chrome: {e}")
-            self.finished.emit(0, 0, "erro chrome")
-            return
 
-        successes = 0
-        failures = 0
-        current_page_is_form = False
+# ==========================
+# VERIFICAÇÃO DE ATUALIZAÇÃO (COMPARTILHADA)
+# ==========================
 
-        try:
-            for index, row in df.iterrows():
-                if self.stopped():
-                    self.finished.emit(successes, failures, "parado pelo usuário")
-                    return
-
-                self.log.emit(f"\n📝 Processando registro {index + 1}/{len(df)}...")
-                self.progress.emit(index, len(df))
-                self.status.emit(f"▶️ Processando registro {index + 1} de {len(df)}")
-
-                # Garante estar no formulário limpo
-                try:
-                    if not current_page_is_form:
-                        self.log.emit("  -> Recarregando formulário...")
-                        self.driver.get(self.form_url)
-                        wait.until(EC.presence_of_element_located((By.TAG_NAME, 'form')))
-                        current_page_is_form = True
-                except WebDriverException as e:
-                    if self.stopped():
-                        self.finished.emit(successes, failures, "parado pelo usuário")
-                        return
-                    self.log.emit(f"⚠️ Falha ao carregar o formulário. Tentativa de recuperação: {e}")
-                    failures += 1
-                    current_page_is_form = False
-                    continue
-
-                # Preenchimento de campos
-                current_submission_failed = False
-                for entry_selector, column_name in self.field_mapping.items():
-                    if self.stopped():
-                        self.finished.emit(successes, failures, "parado pelo usuário")
-                        return
-                    
-                    valor = str(row[column_name]) if pd.notna(row[column_name]) else ""
-                    
-                    if not self._try_fill_field(wait, entry_selector, column_name, valor):
-                        # Se _try_fill_field retorna False, é falha ou parada (tratada dentro da função)
-                        if self.stopped():
-                            self.finished.emit(successes, failures, "parado pelo usuário")
-                            return
-                        current_submission_failed = True
-                        break
-
-                if current_submission_failed:
-                    failures += 1
-                    current_page_is_form = False
-                    self.log.emit(f"Registro {index + 1}: ❌ FALHA no preenchimento. Pulando.")
-                    continue
-
-                # Submissão
-                try:
-                    self.log.emit("  -> 📤 Tentando submeter...")
-                    submit_button_xpath = '//div[@role="button"]//*[normalize-space(text())="Enviar"]'
-                    submit_label = wait.until(EC.element_to_be_clickable((By.XPATH, submit_button_xpath)))
-                    submit_label.find_element(By.XPATH, '..').click()
-
-                    # Espera pela mensagem de sucesso
-                    success_message_xpath = (
-                        '//div[contains(text(), "Sua resposta foi registrada")] | '
-                        '//div[contains(text(), "Sua resposta foi enviada")]'
-                    )
-                    wait.until(EC.presence_of_element_located((By.XPATH, success_message_xpath)))
-
-                    self.log.emit(f"Registro {index + 1}: ✅ SUCESSO! Submetido.")
-                    successes += 1
-                    time.sleep(0.6)
-
-                    # Prepara a próxima resposta
-                    if index < len(df) - 1:
-                        self.log.emit("  -> 🔄 Preparando próxima resposta...")
-                        next_response_xpath = (
-                            '//a[contains(text(), "Enviar outra resposta")] | '
-                            '//div[@role="button"]//*[normalize-space(text())="Enviar outra resposta"]'
-                        )
-                        next_btn = WebDriverWait(self.driver, 8).until(
-                            EC.element_to_be_clickable((By.XPATH, next_response_xpath))
-                        )
-                        next_btn.click()
-                        current_page_is_form = True
-                    else:
-                        self.log.emit("  -> Fim da lista de registros.")
-
-                except WebDriverException:
-                    if self.stopped():
-                        # Parada suave durante a submissão/espera de sucesso
-                        self.finished.emit(successes, failures, "parado pelo usuário")
-                        return
-                    raise # É uma falha inesperada se não tiver sido parado
-
-                except Exception as e:
-                    if self.stopped():
-                        # Caso a thread tenha sido parada e a exceção não tenha sido WebDriverException
-                        self.finished.emit(successes, failures, "parado pelo usuário")
-                        return
-                    self.log.emit(f"Registro {index + 1}: ❌ FALHA na submissão. Erro: {e.__class__.__name__}")
-                    failures += 1
-                    current_page_is_form = False
-
-            # Fim do loop
-            reason = "concluído"
-            self.finished.emit(successes, failures, reason)
+# Protocolo de atualização (cache, manifest com ETag, SHA-256) em updater_core.py, o mesmo dos atualizadores
+_app_updater = None
+
+
+def app_updater():
+    """ManifestUpdater da pasta do app, criado no primeiro uso (updater_core é importado só aqui)."""
+    global _app_updater
+    if _app_updater is None:
+        from updater_core import ManifestUpdater
+        _app_updater = ManifestUpdater(APP_DIR, REPO_RAW_URL)
+    return _app_updater
+
+
+def check_online_version(force: bool = False):
+    """Retorna (versao_online, erro), indo à rede no máximo uma vez por hora (cache compartilhado)."""
+    try:
+        return app_updater().check_online_version(force)
+    except ImportError as e:
+        return "", f"updater_core.py ausente ({e})"
 
-        except Exception as e:
-            if self.stopped():
-                # Se parou aqui, é porque o driver foi fechado por request_stop()
-                self.finished.emit(successes, failures, "parado pelo usuário (driver fechado)")
-            else:
-                # Erro não esperado
-                self.log.emit(f"🚨 ERRO CRÍTICO no loop principal: {e}")
-                self.finished.emit(successes, failures, f"erro inesperado: {e.__class__.__name__}")
-        
-        finally:
-            # Garante que o driver feche. Usamos 'self.driver' como flag de que o quit() não foi chamado.
-            try:
-                if self.driver and (not self.keep_open or self.stopped()):
-                    self.driver.quit()
-            except Exception:
-                pass
-            self.driver = None
+
+def apply_manifest_update() -> list:
+    """Atualiza os arquivos listados no manifest, baixando só os que mudaram. Retorna os nomes baixados."""
+    return app_updater().apply_update()
 
 
 # ==========================
@@ -372,16 +176,90 @@ class UpdateWorker(QThread):
     result = Signal(str, str)  # Sinal emitido com (versao_online, erro_msg)
 
     def run(self):
-        try:
-            repo_url = "https://raw.githubusercontent.com/Kvsl11/Auto_form/main/version.txt"
-            resposta = requests.get(repo_url, timeout=8, verify=False)
-            resposta.raise_for_status()
-            versao_online = resposta.text.strip()
-            self.result.emit(versao_online, "")
-        except requests.exceptions.RequestException as e:
-            self.result.emit("", f"Falha de rede: {e}")
-        except Exception as e:
-            self.result.emit("", f"Erro inesperado: {e}")
+        versao_online, erro = check_online_version()
+        self.result.emit(versao_online, erro)
+
+
+# ==========================
+# LOG (BUFFER EM LOTE + ARQUIVO)
+# ==========================
+
+LOGS_DIR = APP_DIR / "logs"
+LOG_FLUSH_INTERVAL_MS = 150     # intervalo entre as descargas do buffer na tela
+LOG_VIEW_MAX_LINES = 5000       # linhas mantidas na tela (as mais antigas saem)
+LOG_BUFFER_MAX_LINES = 20000    # limite do buffer se a tela não acompanhar
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+
+
+def build_file_logger():
+    """Logger que grava o log completo em logs/auto_form.log, com rotação por tamanho."""
+    logger = logging.getLogger("auto_form")
+    if logger.handlers:
+        return logger
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    try:
+        LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            LOGS_DIR / "auto_form.log",
+            maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUPS,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+    except OSError:
+        logger.addHandler(logging.NullHandler())
+    return logger
+
+
+class LogPipeline:
+    """Leva o log dos workers até a tela em lotes, sem um evento Qt por mensagem.
+
+    push() pode ser chamado de qualquer thread (conectado com DirectConnection):
+    grava a linha no arquivo e a guarda no buffer. Um QTimer na thread da UI
+    descarrega o buffer de uma vez no QPlainTextEdit, que mantém só as
+    últimas LOG_VIEW_MAX_LINES linhas.
+    """
+
+    def __init__(self, view: QPlainTextEdit, parent=None):
+        self.view = view
+        self.view.setMaximumBlockCount(LOG_VIEW_MAX_LINES)
+        self.file_logger = build_file_logger()
+        self._buffer = deque(maxlen=LOG_BUFFER_MAX_LINES)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self.timer = QTimer(parent)
+        self.timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start()
+
+    def push(self, text: str):
+        self.file_logger.info(text)
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self._dropped += 1
+            self._buffer.append(text)
+
+    def flush(self):
+        with self._lock:
+            if not self._buffer:
+                return
+            lines = list(self._buffer)
+            self._buffer.clear()
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            lines.insert(0, f"... {dropped} linhas omitidas na tela (veja o arquivo de log) ...")
+        self.view.appendPlainText("\n".join(lines))
+        scrollbar = self.view.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
+    def clear(self):
+        with self._lock:
+            self._buffer.clear()
+            self._dropped = 0
+        self.view.clear()
 
 
 # ==========================
@@ -396,6 +274,8 @@ class MainWindow(QMainWindow):
         self.worker: FormsWorker | None = None
         self.update_worker: UpdateWorker | None = None
         self.update_btn: QPushButton | None = None
+        # Navegadores aquecidos: abertos com o app e reaproveitados entre execuções
+        self.browser_pool = BrowserSessionManager()
 
         # Widgets
         self.url_edit = QLineEdit(DEFAULT_FORM_URL)
@@ -404,20 +284,53 @@ class MainWindow(QMainWindow):
         self.browse_btn = QPushButton("📂 Procurar Arquivo")
         self.headless_cb = QCheckBox("Executar Invisível (Headless)")
         self.keep_open_cb = QCheckBox("Manter navegador aberto após o fim")
+        self.http_cb = QCheckBox("Envio direto (HTTP, sem navegador)")
+        self.js_fill_cb = QCheckBox("Preenchimento rápido (JavaScript)")
+        self.js_fill_cb.setChecked(True)
+        self.js_fill_cb.setToolTip("Preenche todos os campos de texto de uma linha em uma única chamada ao navegador.")
+        self.prefill_cb = QCheckBox("Pré-preencher via URL")
+        self.prefill_cb.setChecked(True)
+        self.prefill_cb.setToolTip("Abre cada linha já preenchida pelo link entry.<id>=valor e só confere e envia.")
+        self.resume_cb = QCheckBox("Pular registros já enviados")
+        self.resume_cb.setChecked(True)
+        self.resume_cb.setToolTip("Retoma a última execução: linhas já confirmadas no diário de envios não são reenviadas.")
+        self.http_cb.setToolTip("Envia as respostas direto ao Forms, sem abrir o Chrome. Não funciona com login/captcha.")
+        self.block_cb = QCheckBox("Bloquear imagens/fontes")
+        self.block_cb.setChecked(True)
+        self.block_cb.setToolTip(
+            "Bloqueia imagens, fontes e analytics no Chrome (DevTools) para cada página carregar mais rápido.\n"
+            "Padrões liberados: um por linha em bloqueio_permitidos.txt, na pasta do app."
+        )
+        self.warm_cb = QCheckBox("Navegador pré-aberto")
+        self.warm_cb.setChecked(True)
+        self.warm_cb.setToolTip("Abre o Chrome junto com o app e o reaproveita entre execuções, sem esperar ele iniciar a cada clique.")
+        self.pool_spin = QSpinBox()
+        self.pool_spin.setRange(0, MAX_BROWSER_SESSIONS)
+        self.pool_spin.setSpecialValueText(f"Automático ({auto_pool_size()})")
+        self.pool_spin.setToolTip("Quantidade de navegadores abertos em paralelo. 0 = automático (CPU/RAM).")
         
         self.start_btn = QPushButton("▶ Iniciar Automação")
         self.stop_btn = QPushButton("■ Parar")
+        self.resume_btn = QPushButton("⏯ Retomar")
+        self.resume_btn.setToolTip("Retoma a execução pausada pelo disjuntor (muitas falhas seguidas).")
+        self.resume_btn.hide()
         
         self.start_btn.setObjectName("start_btn")
         self.stop_btn.setObjectName("stop_btn")
 
         self.progress_bar = QProgressBar()
+        self.tally_label = QLabel("")
+        self.circuit_label = QLabel("")
+        self.circuit_label.setWordWrap(True)
+        self.circuit_label.setStyleSheet("color: #ee8715; font-weight: bold;")
+        self.circuit_label.hide()
         self.log_view = QPlainTextEdit()
         self.log_view.setReadOnly(True)
         self.log_view.setWordWrapMode(QTextOption.NoWrap)
         
         mono = QFont("Consolas" if sys.platform.startswith("win") else "Menlo", 10)
         self.log_view.setFont(mono)
+        self.log_pipeline = LogPipeline(self.log_view, self)
 
         # Layouts
         title_label = QLabel("Auto - Form")
@@ -440,13 +353,26 @@ class MainWindow(QMainWindow):
         check_layout = QHBoxLayout()
         check_layout.addWidget(self.headless_cb)
         check_layout.addWidget(self.keep_open_cb)
+        check_layout.addWidget(self.js_fill_cb)
+        check_layout.addWidget(self.prefill_cb)
+        check_layout.addWidget(self.block_cb)
         check_layout.addStretch(1)
         top_grid.addLayout(check_layout, 3, 1, 1, 3)
-        top_grid.setRowStretch(3, 1)
+
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(self.http_cb)
+        options_layout.addWidget(self.resume_cb)
+        options_layout.addWidget(self.warm_cb)
+        options_layout.addWidget(QLabel("Navegadores em paralelo:"))
+        options_layout.addWidget(self.pool_spin)
+        options_layout.addStretch(1)
+        top_grid.addLayout(options_layout, 4, 1, 1, 3)
+        top_grid.setRowStretch(4, 1)
 
         buttons_row = QHBoxLayout()
         buttons_row.addWidget(self.start_btn)
         buttons_row.addWidget(self.stop_btn)
+        buttons_row.addWidget(self.resume_btn)
         buttons_row.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
 
         center = QVBoxLayout()
@@ -456,6 +382,8 @@ class MainWindow(QMainWindow):
         center.addLayout(buttons_row)
         center.addWidget(QLabel("📈 Progresso:"))
         center.addWidget(self.progress_bar)
+        center.addWidget(self.tally_label)
+        center.addWidget(self.circuit_label)
         center.addWidget(QLabel("📜 Logs:"))
         center.addWidget(self.log_view)
 
@@ -472,6 +400,10 @@ class MainWindow(QMainWindow):
         self.browse_btn.clicked.connect(self.on_browse)
         self.start_btn.clicked.connect(self.on_start)
         self.stop_btn.clicked.connect(self.on_stop)
+        self.resume_btn.clicked.connect(self.on_resume)
+        self.warm_cb.toggled.connect(self._on_browser_options_changed)
+        self.headless_cb.toggled.connect(self._on_browser_options_changed)
+        self.http_cb.toggled.connect(self._on_browser_options_changed)
 
         # Estado inicial
         self.stop_btn.setEnabled(False)
@@ -480,6 +412,21 @@ class MainWindow(QMainWindow):
         self._build_menu()
         self._check_for_updates()
         
+    def warm_up_browser(self):
+        """Deixa um Chrome aberto em segundo plano para a próxima execução (se a opção estiver ligada)."""
+        if self.warm_cb.isChecked() and not self.http_cb.isChecked():
+            self.browser_pool.warm_up(self.headless_cb.isChecked())
+
+    def _on_browser_options_changed(self, _checked: bool):
+        # O navegador guardado não serve mais (modo headless trocado, HTTP ou opção desligada)
+        self.browser_pool.quit_in_background(self.browser_pool.clear())
+        self.warm_up_browser()
+
+    def closeEvent(self, event):
+        # Fecha o Chrome fora da thread da interface; a thread não-daemon segura o processo até terminar
+        self.browser_pool.quit_in_background(self.browser_pool.shutdown(), daemon=False)
+        super().closeEvent(event)
+
     def _check_for_updates(self):
         self.status.showMessage("🔄 Verificando atualizações...")
         self.update_worker = UpdateWorker()
@@ -520,21 +467,16 @@ class MainWindow(QMainWindow):
             self.status.showMessage(f"🟢 Atualizado — v{VERSAO}")
 
     def _download_and_apply_update(self, versao_online):
-        script_url = "https://raw.githubusercontent.com/Kvsl11/Auto_form/main/main.py"
-        
         if self.update_btn:
             self.update_btn.setText("⬇ Baixando...")
             self.update_btn.setEnabled(False)
 
         try:
-            r = requests.get(script_url, timeout=15, verify=False)
-            r.raise_for_status()
-
-            local_path = os.path.abspath(sys.argv[0])
-            with open(local_path, "wb") as f:
-                f.write(r.content)
+            baixados = apply_manifest_update()
+            local_path = str(APP_DIR / "main.py")
+            detalhe = ", ".join(baixados) if baixados else "nenhum arquivo precisou ser baixado"
 
-            QMessageBox.information(self, "Atualização Concluída", f"✅ Atualizado para v{versao_online}.\nO app será reiniciado.")
+            QMessageBox.information(self, "Atualização Concluída", f"✅ Atualizado para v{versao_online} ({detalhe}).\nO app será reiniciado.")
             
             # Inicia um novo processo e fecha o atual
             subprocess.Popen([sys.executable, local_path])
@@ -668,8 +610,7 @@ class MainWindow(QMainWindow):
         """)
 
     def append_log(self, text: str):
-        self.log_view.appendPlainText(text)
-        self.log_view.verticalScrollBar().setValue(self.log_view.verticalScrollBar().maximum())
+        self.log_pipeline.push(text)
 
     def on_browse(self):
         path, _ = QFileDialog.getOpenFileName(self, "Selecionar planilha Excel", str(Path.home()), "Arquivos Excel (*.xlsx)")
@@ -681,6 +622,7 @@ class MainWindow(QMainWindow):
         excel_path = self.path_edit.text().strip()
         headless = self.headless_cb.isChecked()
         keep_open = self.keep_open_cb.isChecked()
+        worker_cls = FormsHttpWorker if self.http_cb.isChecked() else FormsWorker
 
         if not form_url.startswith("http"):
             QMessageBox.warning(self, "URL inválida", "Informe uma URL válida do Google Forms.")
@@ -690,9 +632,11 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Planilha inválida", "Selecione um arquivo .xlsx válido.")
             return
 
-        self.log_view.clear()
+        self.log_pipeline.clear()
         self.progress_bar.setValue(0)
         self.progress_bar.setFormat("%p%")
+        self.tally_label.setText("")
+        self.circuit_label.hide()
         self.status.showMessage("🚀 Iniciando automação...")
         self.toggle_controls(running=True)
 
@@ -700,15 +644,24 @@ class MainWindow(QMainWindow):
         self.append_log("   INICIANDO AUTOMAÇÃO DE GOOGLE FORMS")
         self.append_log("==================================================")
 
-        self.worker = FormsWorker(
+        self.worker = worker_cls(
             form_url=form_url,
             excel_path=excel_path,
             field_mapping=FIELD_MAPPING_DEFAULT,
             headless=headless,
-            keep_open=keep_open
+            keep_open=keep_open,
+            pool_size=self.pool_spin.value(),
+            resume=self.resume_cb.isChecked(),
+            js_fill=self.js_fill_cb.isChecked(),
+            prefill=self.prefill_cb.isChecked(),
+            browser_pool=self.browser_pool if self.warm_cb.isChecked() else None,
+            block_resources=self.block_cb.isChecked(),
         )
-        self.worker.log.connect(self.append_log)
+        # DirectConnection: a mensagem vai direto para o buffer, sem um evento Qt por linha
+        self.worker.log.connect(self.log_pipeline.push, Qt.ConnectionType.DirectConnection)
         self.worker.progress.connect(self.on_progress)
+        self.worker.tally.connect(self.on_tally)
+        self.worker.circuit.connect(self.on_circuit)
         self.worker.status.connect(self.status.showMessage)
         self.worker.finished.connect(self.on_finished)
         self.worker.start()
@@ -719,18 +672,41 @@ class MainWindow(QMainWindow):
             self.worker.request_stop()
             self.status.showMessage("🛑 Solicitando parada...")
 
+    def on_resume(self):
+        if self.worker and self.worker.isRunning():
+            self.resume_btn.setEnabled(False)
+            self.worker.resume()
+
+    def on_circuit(self, state: str, detail: str):
+        if state == "fechado":
+            self.circuit_label.hide()
+            self.resume_btn.hide()
+            return
+        if state == "pausado":
+            self.circuit_label.setText(f"⏸️ Pausado pelo disjuntor: {detail}.")
+            self.resume_btn.setEnabled(True)
+            self.resume_btn.show()
+        else:
+            self.circuit_label.setText(f"⚡ Muitas falhas ({detail}). Verificando o formulário...")
+            self.resume_btn.hide()
+        self.circuit_label.show()
+
     def on_progress(self, current: int, total: int):
         if total > 0:
             value = int(((current + 1) / total) * 100)
             self.progress_bar.setValue(value)
             self.progress_bar.setFormat(f"Processando {current + 1}/{total} (%p%)")
 
+    def on_tally(self, successes: int, failures: int):
+        self.tally_label.setText(f"✅ Sucessos: {successes}   ❌ Falhas: {failures}")
+
     def on_finished(self, successes: int, failures: int, reason: str):
         if self.worker:
             self.worker.wait()
             self.worker = None
 
         self.toggle_controls(running=False)
+        self.warm_up_browser()
         
         if reason == "concluído":
             self.progress_bar.setValue(100)
@@ -746,6 +722,7 @@ class MainWindow(QMainWindow):
         self.append_log(f"✅ Enviados com sucesso: {successes}")
         self.append_log(f"❌ Falhas: {failures}")
         self.append_log("==============================")
+        self.log_pipeline.flush()
         
         self.status.showMessage(f"✅ {summary}")
 
@@ -776,53 +753,97 @@ class MainWindow(QMainWindow):
     def toggle_controls(self, running: bool):
         self.start_btn.setEnabled(not running)
         self.stop_btn.setEnabled(running)
+        if not running:
+            self.resume_btn.hide()
         self.url_edit.setEnabled(not running)
         self.path_edit.setEnabled(not running)
         self.browse_btn.setEnabled(not running)
         self.headless_cb.setEnabled(not running)
         self.keep_open_cb.setEnabled(not running)
+        self.http_cb.setEnabled(not running)
+        self.resume_cb.setEnabled(not running)
+        self.warm_cb.setEnabled(not running)
+        self.js_fill_cb.setEnabled(not running)
+        self.prefill_cb.setEnabled(not running)
+        self.block_cb.setEnabled(not running)
+        self.pool_spin.setEnabled(not running)
         if self.update_btn:
             self.update_btn.setEnabled(not running)
 
 
-def main():
-    apply_ssl_fix()
-
-    # --- Verifica atualização antes de iniciar a UI ---
-    repo_version_url = "https://raw.githubusercontent.com/Kvsl11/Auto_form/main/version.txt"
-    script_url = "https://raw.githubusercontent.com/Kvsl11/Auto_form/main/main.py"
-    local_path = os.path.abspath(sys.argv[0])
-
-    try:
-        print("🔄 Verificando atualizações automáticas...")
-        resp = requests.get(repo_version_url, timeout=8, verify=False)
-        resp.raise_for_status()
-        versao_online = resp.text.strip()
+# ==========================
+# PERFIL DE INICIALIZAÇÃO (--profile-startup)
+# ==========================
 
-        if versao_online != VERSAO:
-            print(f"🟡 Nova versão encontrada: {versao_online} (local: {VERSAO})")
-            print("⬇ Baixando atualização...")
+class StartupProfile:
+    """Cronometra as fases da abertura do app, a partir de _STARTUP_T0 (início das importações)."""
 
-            r = requests.get(script_url, timeout=15, verify=False)
-            r.raise_for_status()
+    def __init__(self):
+        self.phases = []
+        self._last = _STARTUP_T0
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def finish(self, app: QApplication):
+        """Chamado no primeiro ciclo do loop de eventos: mede as importações adiadas, exibe e salva o relatório."""
+        self.mark("primeiro ciclo do loop de eventos")
+        window_ready = self._last - _STARTUP_T0
+        # Mede o que ficou fora da abertura (normalmente carregado em segundo plano)
+        load_sheet_modules()
+        load_browser_modules()
+
+        linhas = ["⏱ Perfil de inicialização:"]
+        linhas += [f"  {fase:<38} {segundos * 1000:8.1f} ms" for fase, segundos in self.phases]
+        linhas.append(f"  {'janela pronta em':<38} {window_ready * 1000:8.1f} ms")
+        linhas.append("  Importações adiadas (fora da abertura):")
+        linhas += [f"  {nome:<38} {segundos * 1000:8.1f} ms" for nome, segundos in LAZY_IMPORT_TIMES.items()]
+        linhas.append("  Detalhe por módulo: python -X importtime main.py --profile-startup")
+
+        REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = REPORTS_DIR / f"inicializacao_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        report = {
+            "versao": VERSAO,
+            "janela_pronta_ms": round(window_ready * 1000, 1),
+            "fases_ms": {fase: round(segundos * 1000, 1) for fase, segundos in self.phases},
+            "importacoes_adiadas_ms": {nome: round(segundos * 1000, 1) for nome, segundos in LAZY_IMPORT_TIMES.items()},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        linhas.append(f"  Relatório salvo em {path}")
+        print("\n".join(linhas), flush=True)
+        app.quit()
 
-            with open(local_path, "wb") as f:
-                f.write(r.content)
 
-            print(f"✅ Atualizado para v{versao_online}. Reiniciando o aplicativo...")
-            subprocess.Popen([sys.executable, local_path])
-            sys.exit(0)
-        else:
-            print(f"🟢 Aplicativo já está atualizado (v{VERSAO})")
+def main():
+    profile = None
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        profile = StartupProfile()
+        profile.mark("importações do módulo")
 
-    except Exception as e:
-        print(f"⚠️ Falha ao verificar/baixar atualização: {e}")
-        print("➡️ Continuando com a versão atual.")
+    apply_ssl_fix()
+    if profile:
+        profile.mark("apply_ssl_fix")
 
-    # --- Inicializa a interface após atualização ---
+    # --- A verificação de atualização roda em segundo plano (UpdateWorker), com resultado em cache ---
     app = QApplication(sys.argv)
+    if profile:
+        profile.mark("QApplication")
     window = MainWindow()
+    if profile:
+        profile.mark("MainWindow()")
     window.show()
+
+    if profile:
+        profile.mark("window.show()")
+        QTimer.singleShot(0, lambda: profile.finish(app))
+    else:
+        # pandas/selenium (e o primeiro Chrome) carregam enquanto o usuário preenche a tela, não antes dela aparecer
+        QTimer.singleShot(0, lambda: threading.Thread(target=preload_heavy_modules, daemon=True).start())
+        QTimer.singleShot(0, window.warm_up_browser)
     sys.exit(app.exec())
 
 
@@ -0,0 +1,54 @@
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Os módulos do app ficam na raiz do repositório (sem pacote instalável)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import form_engine  # noqa: E402
+import form_stub_server  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_app_dirs(tmp_path, monkeypatch):
+    """Diário, esquemas e relatórios de cada teste em uma pasta temporária, nunca em cache/ do app."""
+    form_engine.load_sheet_modules()
+    monkeypatch.setattr(form_engine, "JOURNAL_DIR", tmp_path / "journal")
+    monkeypatch.setattr(form_engine, "SCHEMA_CACHE_DIR", tmp_path / "forms")
+    monkeypatch.setattr(form_engine, "REPORTS_DIR", tmp_path / "relatorios")
+    return tmp_path
+
+
+@pytest.fixture
+def make_sheet(tmp_path):
+    """Grava uma planilha .xlsx (cabeçalho + linhas) e devolve o caminho."""
+    import openpyxl
+
+    def make(header, rows, name="planilha.xlsx"):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(list(header))
+        for row in rows:
+            sheet.append(list(row))
+        path = tmp_path / name
+        workbook.save(path)
+        return str(path)
+
+    return make
+
+
+@pytest.fixture
+def stub_form():
+    """Formulário falso (form_stub_server) numa porta livre; devolve (url do viewform, FormularioFake)."""
+    formulario = form_stub_server.FormularioFake(form_stub_server.PERGUNTAS_PADRAO)
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), form_stub_server.criar_handler(formulario))
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{servidor.server_port}/forms/d/e/teste/viewform", formulario
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
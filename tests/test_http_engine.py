@@ -0,0 +1,69 @@
+"""FormsHttpEngine de ponta a ponta contra o formulário falso (form_stub_server), sem internet."""
+import form_engine as fe
+
+COLUMNS = list(fe.FIELD_MAPPING_DEFAULT.values())
+
+
+def sheet_row(modelo="TRATOR", frota=1000):
+    return ["SOLINFTEC", "UNIDADE 1", "CCT", "FRENTE 1", modelo, frota, "qrm", "qth", "responsável"]
+
+
+def run_engine(url, path, resume=True):
+    engine = fe.FormsHttpEngine(url, path, dict(fe.FIELD_MAPPING_DEFAULT), True, False, resume=resume)
+    logs, finished = [], []
+    engine.on_log = logs.append
+    engine.on_finished = lambda successes, failures, reason: finished.append((successes, failures, reason))
+    engine.run()
+    assert len(finished) == 1
+    return engine, finished[0], logs
+
+
+def test_sends_rows_and_quarantines_invalid_ones(stub_form, make_sheet):
+    url, formulario = stub_form
+    path = make_sheet(COLUMNS, [
+        sheet_row(frota=1000),
+        sheet_row(modelo="TRATORR", frota=1001),  # fora das opções: quarentena, não é enviada
+        sheet_row(frota=None),                    # FROTA obrigatória vazia
+        sheet_row(frota=1003),
+    ])
+
+    engine, (successes, failures, reason), _ = run_engine(url, path)
+
+    assert (successes, failures, reason) == (2, 2, "concluído")
+    assert sorted(engine.quarantine) == [1, 2]
+    frota = f"entry.{formulario.perguntas[COLUMNS.index('FROTA')]['entry_id']}"
+    assert [r[frota] for r in formulario.respostas] == ["1000", "1003"]  # inteiros sem ".0"
+
+
+def test_sends_the_canonical_option_label(stub_form, make_sheet):
+    url, formulario = stub_form
+    path = make_sheet(COLUMNS, [sheet_row(modelo=" trator "), sheet_row(modelo="caminhao")])
+
+    _, (successes, failures, _), _ = run_engine(url, path)
+
+    # O falso, como o Forms, só aceita o texto exato da opção
+    assert (successes, failures) == (2, 0)
+    modelo = f"entry.{formulario.perguntas[COLUMNS.index('MODELO')]['entry_id']}"
+    assert [r[modelo] for r in formulario.respostas] == ["TRATOR", "CAMINHÃO"]
+
+
+def test_resume_skips_rows_already_sent(stub_form, make_sheet):
+    url, formulario = stub_form
+    path = make_sheet(COLUMNS, [sheet_row(frota=1000 + i) for i in range(3)])
+
+    run_engine(url, path)
+    _, (successes, failures, reason), logs = run_engine(url, path)
+
+    assert (successes, failures, reason) == (0, 0, "concluído")
+    assert len(formulario.respostas) == 3
+    assert any("3 registros já enviados" in line for line in logs)
+
+
+def test_without_resume_rows_are_sent_again(stub_form, make_sheet):
+    url, formulario = stub_form
+    path = make_sheet(COLUMNS, [sheet_row(frota=1000 + i) for i in range(2)])
+
+    run_engine(url, path)
+    run_engine(url, path, resume=False)
+
+    assert len(formulario.respostas) == 4
@@ -0,0 +1,49 @@
+import form_engine as fe
+
+
+def sheet_keys(path, columns):
+    journal = fe.SubmissionJournal("formulario")
+    sheet = fe.SheetStream(path, columns)
+    try:
+        return [journal.key_for(raw) for _, _, raw in sheet.iter_rows(fe.ValueFormats().normalize)]
+    finally:
+        sheet.close()
+        journal.close()
+
+
+def test_key_ignores_neighbouring_cells_in_the_same_chunk(make_sheet):
+    rows = [[1000 + i, f"Operador {i}"] for i in range(6)]
+    with_blank = [list(r) for r in rows]
+    with_blank[3][0] = None  # FROTA vazia: o pandas faria a coluna inteira virar float
+
+    before = sheet_keys(make_sheet(["FROTA", "NOME"], with_blank, "antes.xlsx"), ["FROTA", "NOME"])
+    after = sheet_keys(make_sheet(["FROTA", "NOME"], rows, "depois.xlsx"), ["FROTA", "NOME"])
+
+    assert [k for i, k in enumerate(before) if i != 3] == [k for i, k in enumerate(after) if i != 3]
+    assert before[3] != after[3]
+
+
+def test_key_is_canonical_across_cell_types():
+    journal = fe.SubmissionJournal("formulario")
+    try:
+        as_int = journal.key_for([1000, " Ana "])
+        as_float = journal.key_for([1000.0, "Ana"])
+    finally:
+        journal.close()
+    assert as_int.split("#")[0] == as_float.split("#")[0]
+    assert (as_int[-2:], as_float[-2:]) == ("#1", "#2")  # mesma linha repetida: 2ª ocorrência
+
+
+def test_journal_reloads_only_confirmed_rows():
+    journal = fe.SubmissionJournal("formulario")
+    sent, failed = journal.key_for(["1"]), journal.key_for(["2"])
+    journal.record(sent, True, 1)
+    journal.record(failed, False, 2)
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"key": "incompleta"')  # queda durante a gravação
+
+    reopened = fe.SubmissionJournal("formulario")
+    reopened.close()
+    assert reopened.is_sent(sent)
+    assert not reopened.is_sent(failed)
@@ -0,0 +1,61 @@
+import form_engine as fe
+
+
+def test_retry_queue_holds_rows_until_the_backoff_expires():
+    retries = fe.RetryQueue(base_delay=60, max_delay=120)
+    delay = retries.schedule("linha", attempt=1)
+
+    assert 30 <= delay <= 60  # jitter entre metade e o total da espera
+    assert retries.pop() is None
+    assert len(retries) == 1
+    assert 0 < retries.wait_time() <= 60
+
+
+def test_retry_queue_backoff_doubles_up_to_the_cap():
+    retries = fe.RetryQueue(base_delay=2, max_delay=5)
+    assert 2 <= retries.backoff(2) <= 4
+    assert 2.5 <= retries.backoff(10) <= 5
+
+
+def test_retry_queue_final_pass_waits_for_scheduled_rows():
+    retries = fe.RetryQueue(base_delay=0)
+    retries.defer("final")
+    assert retries.pop(final_pass=False) is None
+
+    retries.schedule("agendada", attempt=1)
+    assert retries.pop(final_pass=True) == "agendada"  # a agendada vencida sai antes da passada final
+    assert retries.pop(final_pass=True) == "final"
+    assert retries.pop(final_pass=True) is None
+    assert retries.wait_time() is None
+
+
+def test_retry_queue_drain_empties_everything():
+    retries = fe.RetryQueue(base_delay=60)
+    retries.schedule("a", attempt=1)
+    retries.defer("b")
+    assert sorted(retries.drain()) == ["a", "b"]
+    assert len(retries) == 0
+
+
+def test_breaker_trips_on_consecutive_failures_only():
+    breaker = fe.CircuitBreaker(consecutive=3, failure_rate=0)
+    assert [breaker.record(ok) for ok in (False, False, True, False, False)] == [None] * 5
+    assert breaker.record(False) == "3 falhas seguidas"
+
+
+def test_breaker_failure_rate_needs_a_full_window():
+    breaker = fe.CircuitBreaker(consecutive=0, window=4, failure_rate=0.5)
+    assert breaker.record(False) is None  # 1 de 1 falhou, mas a janela não está cheia
+    assert breaker.record(True) is None
+    assert breaker.record(True) is None
+    assert breaker.record(False) == "50% de falhas nas últimas 4 tentativas"
+
+
+def test_breaker_reset_and_disabled_limits():
+    breaker = fe.CircuitBreaker(consecutive=2, failure_rate=0)
+    breaker.record(False)
+    breaker.reset()
+    assert breaker.record(False) is None
+
+    disabled = fe.CircuitBreaker(consecutive=0, window=2, failure_rate=0)
+    assert all(disabled.record(False) is None for _ in range(10))
@@ -0,0 +1,54 @@
+import datetime
+
+import form_engine as fe
+
+OPTIONS = ["COLHEDORA", "TRATOR ", "CAMINHÃO"]
+
+
+def test_canonical_choices_maps_to_the_option_label():
+    pd = fe.pd
+    values = pd.Series(["trator", " Caminhao ", "COLHEDORA", "TRATORR", ""])
+    assert fe.canonical_choices(values, OPTIONS).tolist() == ["TRATOR", "CAMINHÃO", "COLHEDORA", "TRATORR", ""]
+
+
+def test_canonical_choices_keeps_values_that_are_ambiguous_when_normalized():
+    pd = fe.pd
+    values = pd.Series(["acao", "Ação", "AÇÃO"])
+    # "Ação" e "ACAO" normalizam igual: só o texto exato identifica a opção
+    assert fe.canonical_choices(values, ["Ação", "ACAO"]).tolist() == ["acao", "Ação", "AÇÃO"]
+
+
+def test_value_formats_integers_without_decimal_point():
+    pd = fe.pd
+    chunk = pd.DataFrame({"FROTA": [1000, None, 1002.0], "MEDIDA": [1.5, 2.0, None]})
+    text = fe.ValueFormats(decimal_separator=",").normalize(chunk)
+    assert text["FROTA"].tolist() == ["1000", "", "1002"]
+    assert text["MEDIDA"].tolist() == ["1,5", "2", ""]
+
+
+def test_value_formats_dates_follow_the_question_type():
+    pd = fe.pd
+    stamps = [datetime.datetime(2024, 3, 5), datetime.datetime(2024, 3, 5, 14, 30)]
+    chunk = pd.DataFrame({"QUANDO": stamps, "DIA": stamps})
+    text = fe.ValueFormats().normalize(chunk, {"DIA": {"type": "data"}})
+    assert text["QUANDO"].tolist() == ["05/03/2024", "05/03/2024 14:30"]
+    assert text["DIA"].tolist() == ["2024-03-05", "2024-03-05"]
+
+
+def test_value_formats_mixed_column_and_canonical_choice():
+    pd = fe.pd
+    chunk = pd.DataFrame({"MODELO": [" trator ", 7, None], "OBS": ["  texto ", 3.0, True]})
+    fields = {"MODELO": {"type": "lista", "options": OPTIONS}}
+    text = fe.ValueFormats().normalize(chunk, fields)
+    assert text["MODELO"].tolist() == ["TRATOR", "7", ""]
+    assert text["OBS"].tolist() == ["texto", "3", "True"]
+
+
+def test_preflight_accepts_normalized_matches_and_flags_the_rest():
+    pd = fe.pd
+    fields = {"MODELO": {"type": "lista", "options": OPTIONS, "required": True}}
+    chunk = pd.DataFrame({"MODELO": ["trator", "TRATORR", ""]})
+    problems = fe.preflight_problems(chunk, fields)
+    assert sorted(problems) == [1, 2]
+    assert "quis dizer 'TRATOR'?" in problems[1][0]
+    assert "obrigatória" in problems[2][0]
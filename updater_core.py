@@ -0,0 +1,196 @@
+"""Atualização por manifest, compartilhada pela janela (main.py) e pelos atualizadores.
+
+Única cópia do protocolo de atualização: cache da verificação de versão
+(update_check.json), manifest.json pedido com If-None-Match (ETag salvo em
+manifest_local.json) e downloads em streaming conferidos pelo SHA-256 antes de
+substituir o arquivo (os.replace). Só depende de requests e da biblioteca
+padrão, para rodar no Python embutido dos atualizadores sem Qt nem pandas.
+
+    from updater_core import ManifestUpdater
+    updater = ManifestUpdater(APP_DIR, log=print)
+    versao_online, erro = updater.check_online_version()
+    if versao_online and (versao_online != versao_local or updater.needs_update()):
+        updater.apply_update()
+"""
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+
+import requests
+
+REPO_RAW_URL = "https://raw.githubusercontent.com/Kvsl11/Auto_form/main/"
+UPDATE_CHECK_TTL = 3600         # segundos entre verificações online
+UPDATE_CHECK_ERROR_TTL = 300    # após uma falha de rede, tenta de novo mais cedo
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Resultado da última verificação, compartilhado por todos os atualizadores e pela janela
+UPDATE_CACHE_NAME = "update_check.json"
+# Último manifest aplicado + ETag, para pedir o próximo com If-None-Match
+LOCAL_MANIFEST_NAME = "manifest_local.json"
+
+
+def build_update_session() -> requests.Session:
+    """Sessão HTTP única da atualização (sem verificação SSL, como no restante do app)."""
+    session = requests.Session()
+    session.verify = False
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def file_sha256(path) -> str:
+    """SHA-256 do arquivo local ('' se ele não existir)."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                h.update(chunk)
+    except OSError:
+        return ""
+    return h.hexdigest()
+
+
+class ManifestUpdater:
+    """Verifica a versão online e aplica o manifest.json do repositório em app_dir."""
+
+    def __init__(self, app_dir, base_url: str = REPO_RAW_URL, session: requests.Session | None = None, log=None):
+        self.app_dir = Path(app_dir)
+        self.base_url = base_url
+        self.cache_file = self.app_dir / UPDATE_CACHE_NAME
+        self.local_manifest_file = self.app_dir / LOCAL_MANIFEST_NAME
+        self.log = log or (lambda message: None)
+        self._session = session
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            self._session = build_update_session()
+        return self._session
+
+    # --- Cache da verificação de versão ---
+    def read_update_cache(self):
+        """Última verificação gravada em disco, se ainda estiver dentro do prazo; senão None."""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            ttl = UPDATE_CHECK_ERROR_TTL if cached.get("error") else UPDATE_CHECK_TTL
+            if 0 <= time.time() - float(cached["checked_at"]) < ttl:
+                return cached
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def write_update_cache(self, version: str, error: str = ""):
+        data = {"checked_at": time.time(), "version": version, "error": error}
+        tmp_path = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError:
+            pass
+
+    def check_online_version(self, force: bool = False):
+        """Retorna (versao_online, erro), indo à rede no máximo uma vez por UPDATE_CHECK_TTL."""
+        cached = None if force else self.read_update_cache()
+        if cached:
+            self.log("ℹ️ Usando a verificação de versão recente (cache).")
+            return cached.get("version", ""), cached.get("error", "")
+        try:
+            headers = {"Cache-Control": "no-cache", "Pragma": "no-cache"}
+            resposta = self.session.get(self.base_url + "version.txt", timeout=8, headers=headers)
+            resposta.raise_for_status()
+            versao_online = resposta.text.strip()
+            self.write_update_cache(versao_online)
+            return versao_online, ""
+        except requests.exceptions.RequestException as e:
+            erro = f"Falha de rede: {e}"
+        except Exception as e:
+            erro = f"Erro inesperado: {e}"
+        self.write_update_cache("", erro)
+        return "", erro
+
+    # --- Manifest (SHA-256 por arquivo + ETag) ---
+    def read_local_manifest(self) -> dict:
+        try:
+            with open(self.local_manifest_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_local_manifest(self, etag: str, manifest: dict):
+        tmp_path = self.local_manifest_file.with_name(self.local_manifest_file.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"etag": etag, "manifest": manifest}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.local_manifest_file)
+
+    def fetch_manifest(self, local: dict):
+        """Baixa o manifest.json com If-None-Match; em 304 reaproveita o manifest salvo. Retorna (manifest, etag)."""
+        headers = {}
+        if local.get("etag") and local.get("manifest"):
+            headers["If-None-Match"] = local["etag"]
+        resposta = self.session.get(self.base_url + "manifest.json", timeout=10, headers=headers)
+        if resposta.status_code == 304:
+            self.log("ℹ️ manifest.json não mudou desde a última atualização.")
+            return local["manifest"], local["etag"]
+        resposta.raise_for_status()
+        return resposta.json(), resposta.headers.get("ETag", "")
+
+    def download_verified(self, name: str, expected_sha256: str, destination: Path):
+        """Baixa em streaming para um .tmp, confere o SHA-256 e só então troca o arquivo (os.replace)."""
+        tmp_path = destination.with_name(destination.name + ".tmp")
+        h = hashlib.sha256()
+        try:
+            with self.session.get(self.base_url + name, timeout=20, stream=True) as resposta:
+                resposta.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    for chunk in resposta.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        h.update(chunk)
+                        f.write(chunk)
+            if h.hexdigest() != expected_sha256:
+                raise ValueError(f"SHA-256 de {name} não confere com o manifest.")
+            os.replace(tmp_path, destination)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def apply_update(self) -> list:
+        """Atualiza os arquivos listados no manifest, baixando só os que mudaram. Retorna os nomes baixados.
+
+        Todos os arquivos do manifest vêm juntos (main.py e form_engine.py
+        nunca ficam de versões diferentes); o manifest local só é gravado
+        depois de todos conferidos.
+        """
+        local = self.read_local_manifest()
+        manifest, etag = self.fetch_manifest(local)
+        baixados = []
+        for name, info in manifest.get("files", {}).items():
+            destination = self.app_dir / name
+            if file_sha256(destination) == info["sha256"]:
+                self.log(f"✔️ {name} já está na versão do manifest.")
+                continue
+            self.log(f"⬇️ Baixando {name}...")
+            self.download_verified(name, info["sha256"], destination)
+            baixados.append(name)
+        self.save_local_manifest(etag, manifest)
+        return baixados
+
+    def stale_files(self) -> list:
+        """Arquivos do último manifest aplicado que faltam ou diferem no disco (sem rede)."""
+        manifest = self.read_local_manifest().get("manifest") or {}
+        return [
+            name for name, info in manifest.get("files", {}).items()
+            if file_sha256(self.app_dir / name) != info.get("sha256")
+        ]
+
+    def needs_update(self) -> bool:
+        """True se nunca houve atualização por manifest aqui ou se algum arquivo não confere com ele.
+
+        Cobre instalações em que um atualizador antigo trouxe só o main.py: a
+        versão bate, mas o form_engine.py falta ou é de outra versão.
+        """
+        if not self.read_local_manifest().get("manifest"):
+            return True
+        return bool(self.stale_files())
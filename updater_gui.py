@@ -3,6 +3,7 @@ import requests
 import subprocess
 import ssl
 import time
+import hashlib
 
 # --- Ignorar SSL corporativo (opcional para redes com proxy) ---
 ssl._create_default_https_context = ssl._create_unverified_context
@@ -14,6 +15,8 @@ REPO_NAME = "Auto_form"
 BASE_URL = f"https://raw.githubusercontent.com/{GITHUB_USER}/{REPO_NAME}/main/"
 VERSION_FILE = "version.txt"
 SCRIPT_FILE = "main.py"
+# Protocolo de atualização (cache, manifest com ETag, SHA-256): única cópia em updater_core.py
+CORE_FILE = "updater_core.py"
 
 # --- Caminhos locais ---
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -21,18 +24,31 @@ LOCAL_SCRIPT = os.path.join(APP_DIR, SCRIPT_FILE)
 LOCAL_VERSION_FILE = os.path.join(APP_DIR, VERSION_FILE)
 PYTHON_EMBUTIDO = os.path.join(APP_DIR, "Python313", "python.exe")
 
-# --- Funções auxiliares ---
-def get_remote_version():
-    """Obtém a versão online do repositório GitHub."""
+# --- Atualizador compartilhado ---
+def carregar_atualizador():
+    """Importa o updater_core.py; se ele ainda não estiver na pasta, baixa-o conferindo o SHA-256 do manifest.
+
+    Este atualizador precisa funcionar sozinho em instalações anteriores ao
+    updater_core.py; por isso guarda só este passo inicial.
+    """
     try:
-        headers = {"Cache-Control": "no-cache", "Pragma": "no-cache"}
-        r = requests.get(BASE_URL + VERSION_FILE, timeout=10, verify=False, headers=headers)
-        if r.status_code == 200:
-            return r.text.strip()
-    except Exception as e:
-        print(f"⚠️ Erro ao obter versão remota: {e}")
-    return None
+        import updater_core
+    except ImportError:
+        print(f"⬇️ Baixando {CORE_FILE}...")
+        manifest = requests.get(BASE_URL + "manifest.json", timeout=10, verify=False).json()
+        esperado = manifest["files"][CORE_FILE]["sha256"]
+        r = requests.get(BASE_URL + CORE_FILE, timeout=20, verify=False)
+        r.raise_for_status()
+        if hashlib.sha256(r.content).hexdigest() != esperado:
+            raise ValueError(f"SHA-256 de {CORE_FILE} não confere com o manifest.")
+        tmp_path = os.path.join(APP_DIR, CORE_FILE + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(r.content)
+        os.replace(tmp_path, os.path.join(APP_DIR, CORE_FILE))
+        import updater_core
+    return updater_core.ManifestUpdater(APP_DIR, BASE_URL, log=print)
 
+# --- Funções auxiliares ---
 def get_local_version():
     """Lê a versão local salva em version.txt."""
     if os.path.exists(LOCAL_VERSION_FILE):
@@ -45,15 +61,10 @@ def save_local_version(version):
     with open(LOCAL_VERSION_FILE, "w", encoding="utf-8") as f:
         f.write(version)
 
-def download_main(version):
-    """Baixa o novo main.py atualizado do GitHub."""
+def download_main(updater, version):
+    """Atualiza pelo manifest.json do GitHub, baixando só os arquivos que mudaram."""
     try:
-        print("⬇️ Baixando nova versão do main.py...")
-        headers = {"Cache-Control": "no-cache", "Pragma": "no-cache"}
-        r = requests.get(BASE_URL + SCRIPT_FILE, timeout=20, verify=False, headers=headers)
-        r.raise_for_status()
-        with open(LOCAL_SCRIPT, "wb") as f:
-            f.write(r.content)
+        updater.apply_update()
         save_local_version(version)
         print(f"✅ Atualizado para versão {version}.")
         return True
@@ -81,19 +92,26 @@ def check_update():
     """Verifica se há atualização e baixa automaticamente, se necessário."""
     print("🔍 Verificando atualizações...")
     local_v = get_local_version()
-    remote_v = get_remote_version()
+    try:
+        updater = carregar_atualizador()
+    except Exception as e:
+        print(f"⚠️ Não foi possível obter o {CORE_FILE} ({e}). Executando versão local.")
+        iniciar_app()
+        return
+    remote_v, erro = updater.check_online_version()
 
     print(f"Versão local: {local_v}")
-    print(f"Versão online: {remote_v}")
+    print(f"Versão online: {remote_v or None}")
 
     if not remote_v:
-        print("⚠️ Não foi possível verificar a versão online. Executando versão local.")
+        print(f"⚠️ Não foi possível verificar a versão online ({erro}). Executando versão local.")
         iniciar_app()
         return
 
-    if local_v != remote_v:
-        print(f"🟡 Nova versão detectada ({remote_v}), iniciando atualização automática...")
-        if download_main(remote_v):
+    # Arquivos faltando ou diferentes do manifest também são baixados de novo, mesmo com a versão em dia
+    if local_v != remote_v or updater.needs_update():
+        print(f"🟡 Atualização necessária ({remote_v}), iniciando atualização automática...")
+        if download_main(updater, remote_v):
             print("♻️ Reiniciando com a nova versão...")
             time.sleep(1)
             iniciar_app()